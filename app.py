@@ -1,69 +1,173 @@
-from flask import Flask
-import os
-import json
+from flask import Flask, Response, g, jsonify, request
+import atexit
+import time
 
-from utils.email_sender import send_email
+from utils.background import BackgroundWorker
+from utils.change_feed import get_change_feed
+from utils.config import get_config
+from utils.email_sender import pool_from_config
+from utils.meeting_index import MeetingIndex
+from utils.meeting_store import get_store
+from utils.metrics import counter, histogram, profile_sampled, render
+from utils.outbox import OutboxWorker, get_outbox
+from utils.rsvp_tokens import parse_token, token_secret
 
 app = Flask(__name__)
-LOG_FILE = "logs/meeting_logs.json"
 
-with open("config.json") as f:
-    CONFIG = json.load(f)
-
-SENDER_EMAIL = CONFIG["sender_email"]
-SENDER_PASSWORD = CONFIG["sender_password"]
-SMTP_SERVER = CONFIG.get("smtp_server", "smtp.gmail.com")
-SMTP_PORT = int(CONFIG.get("smtp_port", 465))
+# Long-lived resources are built from the config at startup; per-request
+# settings are read through get_config() so edits apply without a restart.
+CONFIG = get_config()
 FLASK_HOST = CONFIG.get("flask_host", "0.0.0.0")
 FLASK_PORT = int(CONFIG.get("flask_port", 5001))
+STORE = get_store(CONFIG)
+CHANGES = get_change_feed(CONFIG)
+# Loaded on the first RSVP and kept current from the change feed, so
+# lookups don't rebuild meeting dicts from the log on every request.
+INDEX = MeetingIndex(STORE, CHANGES)
+DEFAULT_MEETING_LINK = "https://calendly.com/22cs101-kpriet/30min"
+
+# Follow-up emails reuse authenticated connections across requests.
+MAILER = pool_from_config(CONFIG)
+OUTBOX = get_outbox(CONFIG)
+# Retries, and invites left behind by a crashed scheduler, are picked up here.
+OUTBOX_WORKER = OutboxWorker(OUTBOX, MAILER.send, float(CONFIG.get("outbox_poll_seconds", 15))).start()
+
+# Follow-ups are sent off the request thread; shutdown drains the queue
+# before the SMTP pool is closed (atexit runs handlers in reverse order).
+FOLLOWUPS = BackgroundWorker("followup", maxsize=int(CONFIG.get("followup_queue_size", 100)))
+atexit.register(MAILER.close)
+atexit.register(OUTBOX_WORKER.stop)
+atexit.register(FOLLOWUPS.shutdown)
+
+REQUEST_SECONDS = histogram("http_request_seconds", "Request latency by endpoint", ["endpoint"])
+REQUESTS = counter("http_requests_total", "Requests by endpoint and status code", ["endpoint", "status"])
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def profile_settings():
+    # Off unless profile_sample_rate is set; read per request so it can be
+    # switched on while chasing a slow RSVP without restarting.
+    config = get_config()
+    return (
+        float(config.get("profile_sample_rate", 0)),
+        float(config.get("profile_slow_ms", 500)),
+        config.get("profile_dir", "logs/profiles"),
+    )
+
+def find_meeting(meeting_id):
+    # The index can trail the store by a meeting scheduled a moment ago.
+    return INDEX.get_meeting(meeting_id) or STORE.get_meeting(meeting_id)
+
+
+def update_rsvp(email, response, meeting_id=None):
+    # The store reads the previous status and appends the change event under
+    # its write lock, so concurrent clicks can't both report the same change.
+    recorded = STORE.record_rsvp(email, response, meeting_id, feed=CHANGES)
+    INDEX.sync()
+    return recorded
 
-def update_rsvp(email, response):
-    if not os.path.exists(LOG_FILE):
-        return
-
-    with open(LOG_FILE, 'r+') as f:
-        data = json.load(f)
-        for meeting in data:
-            if email in meeting.get("emails", []) and meeting.get("rsvp", {}).get(email) is None:
-                if "rsvp" not in meeting:
-                    meeting["rsvp"] = {}
-                meeting["rsvp"][email] = response
-                break
-        f.seek(0)
-        json.dump(data, f, indent=4)
-        f.truncate()
-
-@app.route('/rsvp/accept/<email>')
-def rsvp_accept(email):
-    update_rsvp(email, "Accepted")
-
-    # Load the latest meeting link from logs
-    if not os.path.exists(LOG_FILE):
-        return f"RSVP recorded, but no meeting logs found."
-
-    with open(LOG_FILE, "r") as f:
-        logs = json.load(f)
+
+def resolve_rsvp_key(key):
+    """
+    Map the path segment of an RSVP link to (email, meeting_id).
+
+    New links carry a signed token naming the exact meeting. Older links
+    embed the bare email address and resolve to (email, None), which falls
+    back to the first pending meeting for that address.
+    """
+    if "@" in key:
+        return key, None
+    decoded = parse_token(key, token_secret(get_config()))
+    if decoded is None:
+        return None, None
+    meeting_id, email = decoded
+    return email, meeting_id
+
+
+@app.route('/rsvp/accept/<key>')
+@profile_sampled("rsvp_accept", profile_settings)
+def rsvp_accept(key):
+    email, meeting_id = resolve_rsvp_key(key)
+    if email is None:
+        return "Invalid RSVP link.", 400
+
+    update_rsvp(email, "Accepted", meeting_id)
+
+    if meeting_id is not None:
+        meeting = find_meeting(meeting_id)
+    else:
         # Find the latest meeting this user is part of
-        for meeting in reversed(logs):
-            if email in meeting["emails"]:
-                meeting_link = meeting.get("meet_link", "https://calendly.com/22cs101-kpriet/30min")
-                break
-        else:
-            meeting_link = "https://calendly.com/22cs101-kpriet/30min"  # fallback
+        meeting = INDEX.latest_meeting_for(email) or STORE.latest_meeting_for(email)
+    meeting_link = (meeting or {}).get("meet_link", DEFAULT_MEETING_LINK)
 
     # Send follow-up email with link
     subject = "Your Meeting Link"
     message = f"Hi,\n\nThanks for RSVPing YES! Here's your meeting link:\n{meeting_link}\n\nBest,\nAI Scheduler"
 
-    send_email(email, subject, message, SENDER_EMAIL, SENDER_PASSWORD, SMTP_SERVER, SMTP_PORT)
+    # One follow-up per meeting and invitee, however often the link is clicked.
+    key = f"followup:{(meeting or {}).get('id', 'none')}:{email}"
+    message_id = OUTBOX.enqueue(email, subject, message, key)
+    if not FOLLOWUPS.submit(OUTBOX.deliver, MAILER.send, ids=[message_id]):
+        # Queue is full; the message is durable and the outbox worker will send it.
+        OUTBOX_WORKER.wake()
 
-    return f"✅ Thanks {email}, your RSVP was recorded and the meeting link has been sent to your inbox!"
+    return f"✅ Thanks {email}, your RSVP was recorded and the meeting link is on its way to your inbox!"
 
 
-@app.route('/rsvp/decline/<email>')
-def rsvp_decline(email):
-    update_rsvp(email, "Declined")
+@app.route('/rsvp/decline/<key>')
+@profile_sampled("rsvp_decline", profile_settings)
+def rsvp_decline(key):
+    email, meeting_id = resolve_rsvp_key(key)
+    if email is None:
+        return "Invalid RSVP link.", 400
+
+    update_rsvp(email, "Declined", meeting_id)
     return f"Thanks, {email}, your RSVP has been recorded as: ❌ Declined"
 
+@app.route('/healthz')
+def healthz():
+    followups = FOLLOWUPS.stats()
+    saturated = followups["queue_depth"] >= followups["queue_max"]
+    return jsonify({
+        "status": "degraded" if saturated else "ok",
+        "followups": followups,
+        "outbox": OUTBOX.counts(),
+    })
+
+@app.route('/api/summary')
+def api_summary():
+    # Read under the store's write lock so the cursor and the counts describe
+    # the same state.
+    cursor, summary = STORE.snapshot(CHANGES)
+    return jsonify({"cursor": cursor, **summary})
+
+
+@app.route('/api/changes')
+def api_changes():
+    """Changes after ?since=<seq> (at most ?limit=, default 500), oldest first."""
+    try:
+        since = max(0, int(request.args.get("since", 0)))
+        limit = min(max(1, int(request.args.get("limit", 500))), 5000)
+    except ValueError:
+        return jsonify({"error": "'since' and 'limit' must be integers"}), 400
+    return jsonify(CHANGES.since(since, limit))
+
+@app.route('/metrics')
+def metrics():
+    """Counters and latency histograms for this process, in Prometheus text format."""
+    return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == '__main__':
     app.run(debug=True, host=FLASK_HOST, port=FLASK_PORT)
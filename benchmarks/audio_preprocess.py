@@ -0,0 +1,116 @@
+"""
+Mic audio preprocessing: payload size and transcription latency.
+
+    python benchmarks/audio_preprocess.py [--fixtures clip1.wav clip2.wav] [--recognize google]
+
+Fixtures are WAV recordings; without --fixtures, synthetic 48 kHz stereo
+clips (noise, a voiced burst, then trailing noise) are used. For each clip
+this prints the raw and prepared (mono, trimmed, 16 kHz 16-bit) sizes and
+the preprocessing time. With --recognize it also times recognition of the
+full-rate untrimmed audio against preprocessing plus recognition of the
+prepared audio, with that SpeechRecognition backend.
+--save DIR writes the synthetic clips out so they can be replayed later.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.audio import BACKENDS, prepare_audio  # noqa: E402
+
+RATE = 48000
+
+
+def synthetic_clip(lead, voiced, tail, rng):
+    """Stereo 16-bit WAV: `lead` s of noise, `voiced` s of harmonics, `tail` s of noise."""
+    total = int((lead + voiced + tail) * RATE)
+    signal = rng.normal(0, 0.003, total)
+    t = np.arange(int(voiced * RATE)) / RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    # Syllable-rate envelope so the burst has gaps like speech does.
+    voice *= 0.25 * (0.55 + 0.45 * np.sin(2 * np.pi * 4 * t))
+    start = int(lead * RATE)
+    signal[start:start + len(voice)] += voice
+    stereo = np.repeat(np.clip(signal, -1, 1)[:, None], 2, axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((stereo * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def recognize(audio_bytes, rate, width, backend):
+    import speech_recognition as sr
+
+    method, takes_language = BACKENDS[backend]
+    audio = sr.AudioData(audio_bytes, sample_rate=rate, sample_width=width)
+    start = time.perf_counter()
+    try:
+        fn = getattr(sr.Recognizer(), method)
+        text = fn(audio, language="en-US") if takes_language else fn(audio)
+    except sr.UnknownValueError:
+        text = ""
+    return text, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", nargs="+", help="recorded WAV files")
+    parser.add_argument("--recognize", choices=sorted(BACKENDS), help="also time recognition with this backend")
+    parser.add_argument("--repeat", type=int, default=20, help="preprocessing runs per clip")
+    parser.add_argument("--save", help="directory to write the synthetic clips to")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        clips = {}
+        for path in args.fixtures:
+            with open(path, "rb") as f:
+                clips[os.path.basename(path)] = f.read()
+    else:
+        rng = np.random.default_rng(3)
+        clips = {
+            f"synthetic-{lead}s-{voiced}s-{tail}s.wav": synthetic_clip(lead, voiced, tail, rng)
+            for lead, voiced, tail in ((0.5, 2, 0.5), (1.5, 3, 2), (2, 6, 3))
+        }
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            for name, data in clips.items():
+                with open(os.path.join(args.save, name), "wb") as f:
+                    f.write(data)
+
+    for name, data in clips.items():
+        payload = {"bytes": data}
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            prepared, rate, width = prepare_audio(payload)
+        per_run = (time.perf_counter() - start) / args.repeat
+        line = (
+            f"{name:<28} raw {len(data) / 1024:8.1f} KiB -> {len(prepared) / 1024:7.1f} KiB "
+            f"({len(data) / max(1, len(prepared)):5.1f}x smaller)  preprocess {per_run * 1000:6.1f} ms"
+        )
+        if args.recognize:
+            # Baseline: full-rate, untrimmed audio (recognizers need mono, so downmix only).
+            with wave.open(io.BytesIO(data)) as wav:
+                full_rate = wav.getframerate()
+            untrimmed = prepare_audio(payload, target_rate=full_rate, trim=False)
+            _, raw_latency = recognize(*untrimmed, args.recognize)
+            line += f"  | recognize full-rate {raw_latency:5.2f} s"
+            text, latency = recognize(prepared, rate, width, args.recognize)
+            line += f"  prepared {latency + per_run:5.2f} s end-to-end ({text!r})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Dashboard data path at 10k / 100k / 1M invite rows.
+
+    python benchmarks/dashboard_build.py [--rows 10000 100000 1000000]
+
+For each size this times:
+  * cold JSON load vs. a repeat load served from the mtime/size cache
+  * the old row-at-a-time DataFrame builder vs. the columnar one
+Needs pandas (and streamlit, which streamlit_app imports).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from utils.meeting_store import JsonMeetingStore  # noqa: E402
+
+INVITEES_PER_MEETING = 10
+
+
+def synthetic_logs(rows):
+    rng = random.Random(42)
+    logs = []
+    for m in range(rows // INVITEES_PER_MEETING):
+        emails = [f"user{rng.randrange(5000)}@example.com" for _ in range(INVITEES_PER_MEETING)]
+        rsvp = {}
+        for email in emails:
+            roll = rng.random()
+            if roll < 0.5:
+                rsvp[email] = None
+            elif roll < 0.8:
+                rsvp[email] = "Accepted"
+            elif roll < 0.9:
+                rsvp[email] = "Declined"
+            else:
+                rsvp[email] = {"status": "Declined", "reason": "conflict"}
+        logs.append({"id": f"m{m}", "emails": emails, "date": f"2026-{m % 12 + 1:02d}-01", "time": "10:00", "rsvp": rsvp})
+    return logs
+
+
+def rowwise_dataframe(logs):
+    """The original per-row builder, kept here as the baseline."""
+    rows = []
+    for entry in logs:
+        for email in entry.get("emails", []):
+            rsvp_entry = entry.get("rsvp", {}).get(email, "Pending")
+            status = rsvp_entry
+            reason = ""
+            if isinstance(rsvp_entry, dict):
+                status = rsvp_entry.get("status", "Declined")
+                reason = rsvp_entry.get("reason", "")
+            rows.append({"Email": email, "Date": entry.get("date"), "Time": entry.get("time"), "RSVP": status, "Reason": reason})
+    return pd.DataFrame(rows)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    from streamlit_app import build_rsvp_dataframe
+
+    for rows in args.rows:
+        logs = synthetic_logs(rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = JsonMeetingStore(os.path.join(tmp, "meeting_logs.json"))
+            store._write(logs)
+            cold_store = JsonMeetingStore(store.path)
+            loaded, cold = timed(cold_store.all_meetings)
+            _, warm = timed(cold_store.all_meetings)
+
+        _, old = timed(rowwise_dataframe, loaded)
+        df, new = timed(build_rsvp_dataframe, loaded)
+        assert len(df) == rows
+        print(
+            f"{rows:>9,} rows  load cold {cold * 1000:8.1f} ms  cached {warm * 1000:6.3f} ms  |  "
+            f"frame row-wise {old * 1000:8.1f} ms  columnar {new * 1000:8.1f} ms  ({old / new:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
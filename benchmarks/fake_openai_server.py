@@ -0,0 +1,109 @@
+"""
+Local stand-in for an OpenAI-compatible /chat/completions endpoint.
+
+Returns a canned extraction after `latency` seconds, either as one JSON body
+or, for `"stream": true` requests, as server-sent events in small chunks.
+The first `throttle` requests get a 429 with `Retry-After`, to exercise
+client retries.
+
+    python benchmarks/fake_openai_server.py --port 8089 --latency 0.3
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED = {
+    "meetings": [
+        {"emails": ["someone@example.com"], "date": "2030-01-01", "time": "10:00", "days": 1},
+        {"emails": ["other@example.com"], "date": "2030-01-04", "time": "15:00", "days": 1},
+    ]
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, content, latency, chunk_size=8):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        for chunk in chunks:
+            time.sleep(latency / len(chunks))
+            event = {"choices": [{"delta": {"content": chunk}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with server.lock:
+            server.requests += 1
+            throttled = server.requests <= server.throttle
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            if throttled:
+                self._json(429, {"error": {"message": "rate limited"}}, [("Retry-After", str(server.retry_after))])
+                return
+            if request.get("stream"):
+                self._stream(json.dumps(CANNED), server.latency)
+                return
+            time.sleep(server.latency)
+            self._json(200, {"choices": [{"message": {"role": "assistant", "content": json.dumps(CANNED)}}]})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, throttle=0, retry_after=1):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--throttle", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeOpenAIServer(port=args.port, latency=args.latency, throttle=args.throttle)
+    print(f"Serving fake completions on {server.url}")
+    server.serve_forever()
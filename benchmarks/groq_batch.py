@@ -0,0 +1,68 @@
+"""
+Serial Groq extraction versus `extract_meetings_many` on a fake server.
+
+    python benchmarks/groq_batch.py --prompts 40 --latency 0.2 --concurrency 8
+
+Uses a throwaway config pointing at the fake server. The local parser and
+response cache are bypassed so every prompt hits the server.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_openai_server import FakeOpenAIServer  # noqa: E402
+from utils import groq_interface  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--throttle", type=int, default=2, help="initial requests answered with 429")
+    args = parser.parse_args()
+
+    prompts = [f"meeting number {i} with someone sometime" for i in range(args.prompts)]
+
+    with FakeOpenAIServer(latency=args.latency, throttle=args.throttle, retry_after=0) as server, \
+            tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump(
+            {
+                "sender_email": "bench@example.com",
+                "sender_password": "unused",
+                "groq_api_key": "fake-key",
+                "groq_api_url": server.url,
+                "groq_max_concurrency": args.concurrency,
+                "local_parser_threshold": 2.0,
+                "groq_cache_size": 0,
+            },
+            config_file,
+        )
+        config_file.flush()
+        os.environ["MEET_SCHEDULER_CONFIG"] = config_file.name
+        os.environ.pop("GROQ_API_KEY", None)
+
+        start = time.perf_counter()
+        serial = [groq_interface.extract_meetings(p) for p in prompts]
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = groq_interface.extract_meetings_many(prompts, max_concurrency=args.concurrency)
+        batch_time = time.perf_counter() - start
+
+        errors = sum("error" in r for r in serial + batch)
+        print(f"serial: {len(serial)} prompts in {serial_time:.2f}s")
+        print(f"batch:  {len(batch)} prompts in {batch_time:.2f}s (concurrency {args.concurrency})")
+        print(f"server requests: {server.requests}, peak in flight: {server.peak_in_flight}, errors: {errors}")
+    os.unlink(config_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Import-time profile of the entry points, as a cold-start regression guard.
+
+    python benchmarks/import_time.py [--budget-ms 400] [module ...]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each module and reports the cumulative time plus the slowest imports. Exits
+non-zero if a module exceeds the budget or pulls in one of the heavy
+dependencies that should only load on demand.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["app", "utils.scheduler", "utils.groq_interface"]
+DEFERRED = ["pandas", "dateparser", "speech_recognition", "requests"]
+
+
+def profile(module):
+    """Return {imported module: (self_us, cumulative_us)} for `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if any module exceeds this")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            timings = profile(module)
+        except RuntimeError as e:
+            print(e)
+            failed = True
+            continue
+        total_ms = timings.get(module, (0, 0))[1] / 1000
+        print(f"{module}: {total_ms:.1f} ms cumulative")
+        slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+        for name, (self_us, _) in slowest:
+            print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+        eager = [name for name in DEFERRED if name in timings]
+        if eager:
+            print(f"  ✗ eagerly imports {', '.join(eager)}")
+            failed = True
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            print(f"  ✗ over budget ({args.budget_ms:.0f} ms)")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
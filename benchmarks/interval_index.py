@@ -0,0 +1,112 @@
+"""
+Conflict checks and free-slot search over large synthetic calendars.
+
+    python benchmarks/interval_index.py [--meetings 10000 100000 1000000] [--queries 1000]
+
+Meetings are 30 minutes on the half hour between 09:00 and 17:00 over two
+years, 2-8 invitees drawn from 2,000 people. For each size this times the
+index build, then `--queries` conflict checks and free-slot searches for
+random 3-person groups, against a linear scan of the log as the baseline.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.interval_index import IntervalIndex, meeting_start  # noqa: E402
+
+PEOPLE = 2000
+DURATION = 30
+START = datetime.date(2025, 1, 1)
+DAYS = 730
+
+
+def synthetic_meetings(count, rng):
+    meetings = []
+    for m in range(count):
+        day = START + datetime.timedelta(days=rng.randrange(DAYS))
+        slot = rng.randrange(16)
+        meetings.append({
+            "id": f"m{m}",
+            "emails": [f"user{rng.randrange(PEOPLE)}@example.com" for _ in range(rng.randint(2, 8))],
+            "date": day.isoformat(),
+            "time": f"{9 + slot // 2:02d}:{30 * (slot % 2):02d}",
+            "rsvp": {},
+        })
+    return meetings
+
+
+def naive_conflicts(meetings, attendees, start, end):
+    """What a log scan costs: parse and compare every meeting."""
+    wanted = set(attendees)
+    length = datetime.timedelta(minutes=DURATION)
+    found = []
+    for meeting in meetings:
+        begin = meeting_start(meeting)
+        if begin is None or begin >= end or begin + length <= start:
+            continue
+        found.extend((email, meeting["id"]) for email in meeting["emails"] if email in wanted)
+    return found
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--naive-queries", type=int, default=20, help="linear scans are slow; sample fewer")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    for count in args.meetings:
+        meetings = synthetic_meetings(count, rng)
+        index, build = timed(IntervalIndex.from_meetings, meetings, DURATION)
+
+        queries = []
+        for _ in range(args.queries):
+            group = [f"user{rng.randrange(PEOPLE)}@example.com" for _ in range(3)]
+            day = START + datetime.timedelta(days=rng.randrange(DAYS))
+            start = datetime.datetime.combine(day, datetime.time(9 + rng.randrange(8)))
+            queries.append((group, start))
+
+        def run_conflicts():
+            for group, start in queries:
+                index.conflicts(group, start, start + datetime.timedelta(minutes=DURATION))
+
+        def run_slots():
+            for group, start in queries:
+                index.find_free_slots(group, (start, start + datetime.timedelta(days=7)), DURATION, hours=(9, 17))
+
+        _, conflicts = timed(run_conflicts)
+        _, slots = timed(run_slots)
+
+        sample = queries[: args.naive_queries]
+        for group, start in sample:
+            end = start + datetime.timedelta(minutes=DURATION)
+            assert sorted(index.conflicts(group, start, end)) == sorted(naive_conflicts(meetings, group, start, end))
+        _, naive = timed(
+            lambda: [naive_conflicts(meetings, g, s, s + datetime.timedelta(minutes=DURATION)) for g, s in sample]
+        )
+
+        per_query = lambda total, n: total / n * 1e6  # noqa: E731
+        print(
+            f"{count:>9,} meetings  build {build * 1000:8.1f} ms  |  "
+            f"conflicts {per_query(conflicts, len(queries)):7.1f} µs  "
+            f"free slots {per_query(slots, len(queries)):7.1f} µs  |  "
+            f"log scan {per_query(naive, len(sample)) / 1000:8.1f} ms per check"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Memory and lookup latency of `MeetingIndex` against the parsed JSON log.
+
+    python benchmarks/meeting_index.py [--rows 1000000] [--lookups 200]
+
+Writes a synthetic log with `--rows` invites (10 per meeting, drawn from
+50k addresses) and compares, for the same data:
+  * memory retained by the list of meeting dicts `JsonMeetingStore` keeps
+    versus a `MeetingIndex` built from it (tracemalloc)
+  * get_meeting / latest_meeting_for / per-invitee status lookups through
+    the store versus through the index
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.meeting_index import MeetingIndex  # noqa: E402
+from utils.meeting_store import JsonMeetingStore  # noqa: E402
+from utils.rsvp_stats import status_of  # noqa: E402
+
+INVITEES_PER_MEETING = 10
+ADDRESSES = 50000
+
+
+def synthetic_logs(rows, rng):
+    logs = []
+    for m in range(rows // INVITEES_PER_MEETING):
+        emails = rng.sample(range(ADDRESSES), INVITEES_PER_MEETING)
+        emails = [f"user{n}@example.com" for n in emails]
+        rsvp = {}
+        for email in emails:
+            roll = rng.random()
+            if roll < 0.5:
+                rsvp[email] = None
+            elif roll < 0.8:
+                rsvp[email] = "Accepted"
+            elif roll < 0.95:
+                rsvp[email] = "Declined"
+            else:
+                rsvp[email] = {"status": "Declined", "reason": "conflict"}
+        logs.append({"id": f"m{m}", "emails": emails, "date": f"2026-{m % 12 + 1:02d}-01", "time": "10:00", "rsvp": rsvp})
+    return logs
+
+
+def timed(label, fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    per_call = (time.perf_counter() - start) / len(keys)
+    print(f"  {label:<28} {per_call * 1e6:12.1f} us")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="invites in the synthetic log")
+    parser.add_argument("--lookups", type=int, default=200, help="lookups per operation")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "meeting_logs.json")
+        logs = synthetic_logs(args.rows, rng)
+        with open(path, "w") as f:
+            json.dump(logs, f)
+        del logs
+        gc.collect()
+
+        store = JsonMeetingStore(path)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        meetings = store.all_meetings()
+        parse_seconds = time.perf_counter() - start
+        dicts = tracemalloc.get_traced_memory()[0] - base
+
+        index = MeetingIndex(store)
+        start = time.perf_counter()
+        index.load()
+        build_seconds = time.perf_counter() - start
+        ids = [rng.choice(meetings)["id"] for _ in range(args.lookups)]
+        pairs = [(meeting_id, rng.choice(store.get_meeting(meeting_id)["emails"])) for meeting_id in ids]
+        emails = [email for _, email in pairs]
+
+        # Drop the parsed log so only the index is left.
+        del meetings
+        store._cached = store._expanded = store._counters = store._cached_stamp = None
+        gc.collect()
+        compact = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+        print(f"{args.rows} invites, {len(index)} meetings")
+        print(f"  meeting dicts (JSON parse)   {dicts / 2**20:9.1f} MiB   {parse_seconds:6.2f} s to load")
+        print(f"  MeetingIndex                 {compact / 2**20:9.1f} MiB   {build_seconds:6.2f} s to build")
+        print(f"  ({dicts / max(1, compact):.1f}x smaller, {compact / args.rows:.0f} bytes per invite)")
+
+        store.all_meetings()
+        print("lookups through the store (parsed log cached):")
+        store_get = timed("get_meeting", store.get_meeting, ids)
+        store_latest = timed("latest_meeting_for", store.latest_meeting_for, emails)
+        store_status = timed(
+            "status", lambda pair: status_of(store.get_meeting(pair[0])["rsvp"].get(pair[1])), pairs
+        )
+        print("lookups through MeetingIndex:")
+        index_get = timed("get_meeting", index.get_meeting, ids)
+        index_latest = timed("latest_meeting_for", index.latest_meeting_for, emails)
+        index_status = timed("status", lambda pair: index.status(*pair), pairs)
+        print(
+            f"speedup: get_meeting {store_get / index_get:.0f}x, latest_meeting_for "
+            f"{store_latest / index_latest:.0f}x, status {store_status / index_status:.0f}x"
+        )
+
+        for meeting_id, email in pairs:
+            expected = store.get_meeting(meeting_id)
+            assert index.get_meeting(meeting_id) == expected, meeting_id
+            assert index.status(meeting_id, email) == status_of(expected["rsvp"].get(email))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Hit rate and latency of the local parser versus the Groq path.
+
+    python benchmarks/parser_latency.py [--llm] [--corpus benchmarks/parser_corpus.jsonl]
+
+A "hit" is a prompt the local parser answers at or above the confidence
+threshold (so Groq is skipped). Where the corpus lists expected fields, hits
+are also checked for correctness. `--llm` additionally times every prompt
+against Groq and needs a configured API key and config.json.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.local_parser import extract_meeting_info_local  # noqa: E402
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(label, samples):
+    print(
+        f"{label:<8} n={len(samples)} p50={_percentile(samples, 50) * 1000:.3f}ms "
+        f"p99={_percentile(samples, 99) * 1000:.3f}ms mean={statistics.mean(samples) * 1000:.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=os.path.join(ROOT, "benchmarks", "parser_corpus.jsonl"))
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=200, help="local timing repetitions per prompt")
+    parser.add_argument("--llm", action="store_true", help="also time the Groq path")
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    hits = wrong = 0
+    local_samples = []
+    for case in corpus:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = extract_meeting_info_local(case["prompt"])
+            local_samples.append(time.perf_counter() - start)
+        if result["confidence"] < args.threshold:
+            continue
+        hits += 1
+        expected = case.get("expected") or {}
+        if not expected or any(result.get(k) != v for k, v in expected.items()):
+            wrong += 1
+            print(f"  mismatch: {case['prompt']!r} -> {result}")
+
+    print(f"local hit rate: {hits}/{len(corpus)} ({hits / len(corpus):.0%}), incorrect hits: {wrong}")
+    _report("local", local_samples)
+
+    if args.llm:
+        os.chdir(ROOT)  # groq_interface reads config.json relative to cwd
+        from utils.groq_interface import _call_groq
+
+        llm_samples = []
+        for case in corpus:
+            start = time.perf_counter()
+            _call_groq(case["prompt"])
+            llm_samples.append(time.perf_counter() - start)
+        _report("groq", llm_samples)
+
+
+if __name__ == "__main__":
+    main()
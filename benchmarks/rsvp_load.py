@@ -0,0 +1,127 @@
+"""
+Concurrent RSVP load test against a shared meeting log.
+
+    python benchmarks/rsvp_load.py --backend json --workers 4 --threads 16 --meetings 50 --invitees 40
+
+Seeds a fresh log in a temporary directory, then starts `--workers`
+processes (like gunicorn workers sharing one file), each firing its share
+of RSVP clicks from `--threads` threads. Every invite gets exactly one
+click, so afterwards none may still be pending: the run fails (exit 1) if
+any update was lost. Prints throughput, acknowledgement latency and how
+many log writes the coalescer needed. --window-ms 0 flushes without
+waiting for more clicks to join a batch.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.meeting_store import JsonMeetingStore, PartitionedJsonStore, SqliteMeetingStore  # noqa: E402
+from utils.rsvp_stats import status_of  # noqa: E402
+from utils.write_coalescer import COALESCED  # noqa: E402
+
+
+def open_store(backend, path, window):
+    if backend == "sqlite":
+        return SqliteMeetingStore(path)
+    factory = JsonMeetingStore if backend == "json" else PartitionedJsonStore
+    return factory(path, coalesce_window=window)
+
+
+def seed(store, meetings, invitees):
+    today = time.strftime("%Y-%m-%d")
+    entries = []
+    for m in range(meetings):
+        emails = [f"user{m}-{i}@example.com" for i in range(invitees)]
+        entries.append({
+            "id": f"meeting{m}",
+            "emails": emails,
+            "date": today,
+            "time": "10:00",
+            "rsvp": {email: None for email in emails},
+        })
+    store.add_meetings(entries)
+    return [(email, entry["id"]) for entry in entries for email in entry["emails"]]
+
+
+def response_for(email):
+    return "Accepted" if sum(map(ord, email)) % 2 else "Declined"
+
+
+def worker(args):
+    backend, path, window, threads, clicks = args
+    store = open_store(backend, path, window)
+
+    def click(pair):
+        email, meeting_id = pair
+        start = time.perf_counter()
+        recorded = store.record_rsvp(email, response_for(email), meeting_id)
+        return recorded == meeting_id, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(click, clicks))
+    writes = COALESCED.value(name=store._rsvps.name, stage="flushed") if backend != "sqlite" else 0
+    return [ok for ok, _ in results], [latency for _, latency in results], writes
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("json", "partitioned", "sqlite"), default="json")
+    parser.add_argument("--workers", type=int, default=4, help="processes sharing the log")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent clicks per process")
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--invitees", type=int, default=40)
+    parser.add_argument("--window-ms", type=float, default=5.0, help="coalescing window (JSON backends)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, {"json": "meetings.json", "partitioned": "meetings", "sqlite": "meetings.db"}[args.backend])
+        window = args.window_ms / 1000
+        pairs = seed(open_store(args.backend, path, window), args.meetings, args.invitees)
+        jobs = [(args.backend, path, window, args.threads, pairs[i::args.workers]) for i in range(args.workers)]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.map(worker, jobs)
+        elapsed = time.perf_counter() - start
+
+        acked = sum(ok for oks, _, _ in results for ok in oks)
+        latencies = [latency for _, lats, _ in results for latency in lats]
+        writes = sum(count for _, _, count in results)
+
+        # A fresh instance, so nothing comes from a worker's cache.
+        stored = {meeting["id"]: meeting for meeting in open_store(args.backend, path, window).all_meetings()}
+        lost = [
+            (email, meeting_id) for email, meeting_id in pairs
+            if status_of(stored[meeting_id]["rsvp"].get(email)) != response_for(email)
+        ]
+
+    print(
+        f"{args.backend}: {len(pairs)} RSVPs from {args.workers} processes x {args.threads} threads "
+        f"in {elapsed:.2f}s ({len(pairs) / elapsed:.0f}/s)"
+    )
+    print(
+        f"ack latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms; "
+        f"{acked} acknowledged"
+        + (f", {writes} log writes ({len(pairs) / max(1, writes):.1f} RSVPs per write)" if args.backend != "sqlite" else "")
+    )
+    if lost or acked != len(pairs):
+        print(f"FAILED: {len(lost)} updates lost, {len(pairs) - acked} not acknowledged")
+        sys.exit(1)
+    print("OK: no updates lost")
+
+
+if __name__ == "__main__":
+    main()
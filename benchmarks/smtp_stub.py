@@ -0,0 +1,77 @@
+"""
+Minimal local SMTP server for benchmarks.
+
+Speaks just enough SMTP (EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, QUIT) for
+smtplib to log in and deliver. `connect_delay` and `login_delay` simulate the
+TCP/TLS handshake and authentication cost of a real provider.
+"""
+
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        time.sleep(server.connect_delay)
+        with server.lock:
+            server.connections += 1
+        self._reply("220 stub ESMTP ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-stub")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                time.sleep(server.login_delay)
+                with server.lock:
+                    server.logins += 1
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with server.lock:
+                    server.messages += 1
+                self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, connect_delay=0.0, login_delay=0.0):
+        super().__init__((host, port), _Handler)
+        self.connect_delay = connect_delay
+        self.login_delay = login_delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
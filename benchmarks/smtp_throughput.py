@@ -0,0 +1,54 @@
+"""
+Compare per-message `send_email` against a pooled `SMTPPool` on a local stub.
+
+    python benchmarks/smtp_throughput.py --messages 200 --connect-delay 0.02 --login-delay 0.02
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.smtp_stub import SMTPStub  # noqa: E402
+from utils.email_sender import SMTPPool, send_email  # noqa: E402
+
+SENDER = "bench@example.com"
+PASSWORD = "secret"
+
+
+def _run(label, stub, send, messages):
+    before = (stub.connections, stub.logins)
+    start = time.perf_counter()
+    for i in range(messages):
+        send(f"user{i}@example.com", "Meeting Invite with RSVP", "Benchmark body")
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<14} {messages} msgs in {elapsed:.3f}s "
+        f"({messages / elapsed:.1f} msg/s, "
+        f"{stub.connections - before[0]} connections, {stub.logins - before[1]} logins)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--connect-delay", type=float, default=0.02, help="simulated TCP/TLS setup (s)")
+    parser.add_argument("--login-delay", type=float, default=0.02, help="simulated AUTH round trip (s)")
+    args = parser.parse_args()
+
+    with SMTPStub(connect_delay=args.connect_delay, login_delay=args.login_delay) as stub:
+        _run(
+            "send_email",
+            stub,
+            lambda to, subject, body: send_email(to, subject, body, SENDER, PASSWORD, "127.0.0.1", stub.port),
+            args.messages,
+        )
+        with SMTPPool(SENDER, PASSWORD, "127.0.0.1", stub.port, size=args.pool_size) as pool:
+            _run("SMTPPool", stub, pool.send, args.messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,5 @@
-import json
+from utils.config import get_config
 
-with open("config.json") as f:
-    config = json.load(f)
 
 def get_calendly_link():
-    return config.get("calendly_link")
+    return get_config().get("calendly_link")
@@ -1,26 +1,27 @@
+import importlib.util
 import io
-import json
-from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
-try:
-    import speech_recognition as sr
-except ImportError:  # feature still works without mic
-    sr = None
-
 try:
     from streamlit_mic_recorder import mic_recorder
 except ImportError:
     mic_recorder = None
 
-from utils.groq_interface import extract_meeting_info
-from utils.scheduler import schedule_meetings
+from utils.change_feed import get_change_feed
+from utils.config import get_config
+from utils.groq_interface import get_cache, stream_meetings
+from utils.meeting_store import get_store
+from utils.metrics import histogram, histograms
+from utils.rsvp_stats import apply_change
+from utils.scheduler import DeliveryError, SchedulingConflict, schedule_many
+
+# pandas and speech_recognition are slow to import; load them only when the
+# dashboard or voice input actually needs them.
+HAS_SPEECH_RECOGNITION = importlib.util.find_spec("speech_recognition") is not None
 
 st.set_page_config(page_title="AI Meeting Scheduler", layout="wide")
 
-LOG_FILE = Path("logs/meeting_logs.json")
 THEMES = {
     "Dark": {
         "bg": "#0d1117",
@@ -51,6 +52,7 @@ def init_state():
         "schedule_status": None,
         "theme": "Dark",
         "voice_language": "English (India)",
+        "dashboard_refresh_seconds": int(get_config().get("dashboard_refresh_seconds", 0)),
     }
     for key, value in defaults.items():
         st.session_state.setdefault(key, value)
@@ -85,52 +87,153 @@ def inject_theme(theme_name: str):
     )
 
 
-def load_meeting_logs():
-    if not LOG_FILE.exists():
-        return []
-    try:
-        return json.loads(LOG_FILE.read_text())
-    except json.JSONDecodeError:
-        return []
+RSVP_COLUMNS = ["Email", "Date", "Time", "RSVP", "Reason"]
+
+DASHBOARD_SECONDS = histogram("dashboard_build_seconds", "Dashboard data preparation", ["view"])
 
 
 def build_rsvp_dataframe(logs):
-    rows = []
+    """
+    One row per invite. Columns are gathered in a single pass and the mixed
+    RSVP encodings (None / "Accepted" / {"status", "reason"}) are normalized
+    in bulk; only the detailed-response rows are touched individually.
+    """
+    import pandas as pd
+
+    emails, dates, times, responses = [], [], [], []
     for entry in logs:
-        for email in entry.get("emails", []):
-            rsvp_entry = entry.get("rsvp", {}).get(email, "Pending")
-            status = rsvp_entry
-            reason = ""
-            if isinstance(rsvp_entry, dict):
-                status = rsvp_entry.get("status", "Declined")
-                reason = rsvp_entry.get("reason", "")
-            rows.append(
-                {
-                    "Email": email,
-                    "Date": entry.get("date"),
-                    "Time": entry.get("time"),
-                    "RSVP": status,
-                    "Reason": reason,
-                }
-            )
-    if not rows:
-        return pd.DataFrame(columns=["Email", "Date", "Time", "RSVP", "Reason"])
-    return pd.DataFrame(rows)
-
-
-def transcribe_audio(payload):
-    if not sr:
-        raise RuntimeError("SpeechRecognition not installed")
-    recognizer = sr.Recognizer()
-    audio_bytes = payload.get("bytes")
-    sample_rate = payload.get("sample_rate") or payload.get("sampleRate")
-    sample_width = payload.get("sample_width") or payload.get("sampleWidth") or 2
-    if not audio_bytes or not sample_rate:
-        raise ValueError("Microphone payload missing audio data or sample rate")
-
-    audio_data = sr.AudioData(audio_bytes, sample_rate=int(sample_rate), sample_width=int(sample_width))
+        invitees = entry.get("emails", [])
+        count = len(invitees)
+        emails.extend(invitees)
+        dates.extend([entry.get("date")] * count)
+        times.extend([entry.get("time")] * count)
+        rsvp = entry.get("rsvp") or {}
+        responses.extend(map(rsvp.get, invitees))
+
+    if not emails:
+        return pd.DataFrame(columns=RSVP_COLUMNS)
+
+    df = pd.DataFrame(
+        {"Email": emails, "Date": dates, "Time": times, "RSVP": responses, "Reason": ""},
+        columns=RSVP_COLUMNS,
+    )
+    detailed = df["RSVP"].map(type).eq(dict)
+    if detailed.any():
+        details = df.loc[detailed, "RSVP"].tolist()
+        df.loc[detailed, "Reason"] = [d.get("reason") or "" for d in details]
+        df.loc[detailed, "RSVP"] = [d.get("status", "Declined") for d in details]
+    df["RSVP"] = df["RSVP"].fillna("Pending")
+    return df
+
+
+def load_rsvp_dataframe():
+    """RSVP frame for the dashboard, rebuilt only when the store has changed."""
+    store = get_store(get_config())
+    version = store.version()
+    cached = st.session_state.get("rsvp_frame")
+    if version is not None and cached and cached[0] == version:
+        return cached[1]
+    with DASHBOARD_SECONDS.time(view="history"):
+        df = build_rsvp_dataframe(store.all_meetings())
+    st.session_state.rsvp_frame = (version, df)
+    return df
+
+
+def _fetch_api(path, **params):
+    """GET a JSON route on the RSVP server; None when it isn't reachable."""
+    import requests
+
+    config = get_config()
+    base_url = config.get("dashboard_api_url") or f"http://127.0.0.1:{int(config.get('flask_port', 5001))}"
+    try:
+        response = requests.get(base_url + path, params=params, timeout=2)
+        response.raise_for_status()
+        return response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def fetch_rsvp_snapshot():
+    snapshot = _fetch_api("/api/summary")
+    if snapshot is None:
+        # RSVP server not running: read the same feed and counters from disk.
+        config = get_config()
+        cursor = get_change_feed(config).cursor()
+        snapshot = {"cursor": cursor, **get_store(config).summary()}
+    snapshot["recent"] = []
+    return snapshot
+
+
+def fetch_rsvp_changes(since):
+    changes = _fetch_api("/api/changes", since=since)
+    if changes is None:
+        changes = get_change_feed(get_config()).since(since)
+    return changes
+
+
+def sync_rsvp_summary():
+    """
+    Dashboard counters held in session state. After the first snapshot only
+    the change-feed events past the stored cursor are fetched and applied.
+    """
+    with DASHBOARD_SECONDS.time(view="summary"):
+        return _sync_rsvp_summary()
+
+
+def _sync_rsvp_summary():
+    live = st.session_state.get("rsvp_live")
+    while live is not None:
+        changes = fetch_rsvp_changes(live["cursor"])
+        if changes["reset"]:
+            live = None
+            break
+        for event in changes["events"]:
+            if not apply_change(live, event):
+                live = None
+                break
+            if event["kind"] == "rsvp":
+                live["recent"] = [event] + live["recent"][:9]
+        if live is None:
+            break
+        live["cursor"] = changes["cursor"]
+        if not changes["more"]:
+            break
+    if live is None:
+        live = fetch_rsvp_snapshot()
+    st.session_state.rsvp_live = live
+    return live
+
+
+def start_transcription(payload):
+    """Preprocess and recognize `payload` in the background; the result is picked up on a later rerun."""
+    from utils.audio import submit_transcription
+
     language_code = LANGUAGE_OPTIONS.get(st.session_state.get("voice_language"), "en-US")
-    return recognizer.recognize_google(audio_data, language=language_code)
+    st.session_state.transcription = submit_transcription(payload, language_code)
+
+
+def render_transcription_status(wait=False):
+    """Poll the background transcription; apply the transcript once it's ready."""
+    job = st.session_state.get("transcription")
+    if job is None:
+        return
+    if not job.done() and not wait:
+        st.info("Transcribing your recording…")
+        return
+    st.session_state.transcription = None
+    import speech_recognition as sr
+
+    try:
+        transcript = job.result()
+    except sr.UnknownValueError:
+        st.warning("Couldn't understand the audio. Try speaking closer to the mic or switch the language setting.")
+        return
+    except Exception as exc:
+        st.error(f"Voice transcription failed: {exc}")
+        return
+    # A widget's value can only be set before it's drawn, so apply it on a full rerun.
+    st.session_state.pending_transcript = transcript
+    (st.rerun if hasattr(st, "rerun") else st.experimental_rerun)()
 
 
 def render_sidebar():
@@ -143,6 +246,12 @@ def render_sidebar():
         theme_choice = st.radio("Theme", list(THEMES.keys()), key="theme", horizontal=True)
         st.caption("Toggle between dark and light experiences.")
         st.selectbox("Voice recognition language", list(LANGUAGE_OPTIONS.keys()), key="voice_language")
+        st.number_input(
+            "Dashboard auto-refresh (seconds, 0 = off)", min_value=0, step=5, key="dashboard_refresh_seconds"
+        )
+        cache_stats = get_cache().stats()
+        st.caption(f"Groq cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        render_timings()
         st.markdown("---")
         st.markdown(
             """**Tips**
@@ -152,7 +261,23 @@ def render_sidebar():
         )
 
 
+def render_timings():
+    """Call counts and mean latencies recorded in this Streamlit process."""
+    rows = []
+    for metric in histograms():
+        for labels, (count, mean) in sorted(metric.stats().items()):
+            name = metric.name + (f" ({', '.join(labels)})" if labels else "")
+            rows.append(f"- {name}: {count} × {mean * 1000:.1f} ms")
+    if rows:
+        with st.expander("Timings"):
+            st.markdown("\n".join(rows))
+
+
 def render_prompt_section():
+    transcript = st.session_state.pop("pending_transcript", None)
+    if transcript is not None:
+        st.session_state.prompt_text = transcript
+        st.success("Voice transcription captured. Feel free to edit before submitting.")
     col_input, col_voice = st.columns([2.2, 1])
     with col_input:
         st.text_area(
@@ -162,7 +287,7 @@ def render_prompt_section():
         )
     with col_voice:
         st.markdown("#### 🎙️ Voice input")
-        if mic_recorder and sr:
+        if mic_recorder and HAS_SPEECH_RECOGNITION:
             st.caption("Record a quick request and we'll transcribe it for you.")
             audio_payload = mic_recorder(
                 start_prompt="Start Recording",
@@ -172,15 +297,14 @@ def render_prompt_section():
                 key="mic",
             )
             if audio_payload:
-                try:
-                    transcript = transcribe_audio(audio_payload)
-                    st.session_state.prompt_text = transcript
-                    st.success("Voice transcription captured. Feel free to edit before submitting.")
-                    st.experimental_rerun()
-                except sr.UnknownValueError:
-                    st.warning("Couldn't understand the audio. Try speaking closer to the mic or switch the language setting.")
-                except Exception as exc:
-                    st.error(f"Voice transcription failed: {exc}")
+                start_transcription(audio_payload)
+            if st.session_state.get("transcription") is not None:
+                if hasattr(st, "fragment"):
+                    # Only this status line re-runs while the recognizer works.
+                    st.fragment(run_every=1)(render_transcription_status)()
+                else:
+                    with st.spinner("Transcribing your recording…"):
+                        render_transcription_status(wait=True)
         else:
             st.caption("Install SpeechRecognition and streamlit-mic-recorder to enable voice input.")
 
@@ -191,8 +315,28 @@ def handle_prompt_submission():
         st.error("Please enter or dictate a scheduling prompt.")
         return
 
+    # Fill in each meeting field by field as the model writes it instead of
+    # waiting for the whole completion.
+    live = st.empty()
+    partial = {"meetings": []}
+    finished = 0
+    result = {"error": "No response from Groq."}
     with st.spinner("Parsing your request with Groq..."):
-        result = extract_meeting_info(prompt)
+        for event in stream_meetings(prompt):
+            if event[0] == "field":
+                _, index, name, value = event
+                if index == len(partial["meetings"]):
+                    partial["meetings"].append({})
+                partial["meetings"][index][name] = value
+                render_parsed_result(partial, live)
+            elif event[0] == "meeting":
+                # The finished meeting replaces its partial card.
+                partial["meetings"][finished:] = [event[1]]
+                finished += 1
+                render_parsed_result(partial, live)
+            else:
+                result = event[1]
+    live.empty()
 
     if result.get("error"):
         st.error(f"Parsing Error: {result['error']}")
@@ -203,19 +347,28 @@ def handle_prompt_submission():
     st.success("Prompt parsed successfully. Review the details below before sending invites.")
 
 
-def render_parsed_result():
-    result = st.session_state.parsed_result
+def render_parsed_result(result=None, placeholder=None):
+    """Render parsed meetings; with `placeholder`, redraw a partial result in place."""
+    if result is None:
+        result = st.session_state.parsed_result
     if not result:
         return
 
-    st.markdown("### Parsed Details")
-    cols = st.columns(3)
-    cols[0].metric("🗓 Date", result.get("date", "-"))
-    cols[1].metric("⏰ Time", result.get("time", "-"))
-    cols[2].metric("📅 Days", result.get("days", "-"))
-    st.markdown(
-        f"**Invites:** `{' , '.join(result.get('emails', [])) or 'None detected'}`"
-    )
+    meetings = result.get("meetings", [])
+    with (placeholder.container() if placeholder is not None else st.container()):
+        st.markdown("### Parsed Details" if len(meetings) < 2 else f"### Parsed Details · {len(meetings)} meetings")
+        if result.get("source") == "local":
+            st.caption(f"Parsed locally without calling Groq (confidence {result.get('confidence', 0):.0%}).")
+        for number, meeting in enumerate(meetings, start=1):
+            if len(meetings) > 1:
+                st.markdown(f"**Meeting {number}**")
+            cols = st.columns(3)
+            cols[0].metric("🗓 Date", meeting.get("date") or "-")
+            cols[1].metric("⏰ Time", meeting.get("time") or "-")
+            cols[2].metric("📅 Days", meeting.get("days") or "-")
+            st.markdown(
+                f"**Invites:** `{' , '.join(meeting.get('emails') or []) or 'None detected'}`"
+            )
 
 
 def send_invites():
@@ -224,36 +377,95 @@ def send_invites():
         st.error("Parse a prompt before sending invites.")
         return
 
+    meetings = result.get("meetings", [])
     try:
         with st.spinner("Sending meeting invites with RSVP links..."):
-            schedule_meetings(
-                result.get("emails", []),
-                result.get("date"),
-                result.get("time"),
-                int(result.get("days", 1)),
-            )
+            scheduled = schedule_many(meetings, allow_conflicts=st.session_state.get("allow_conflicts") or None)
+        skipped = [number for number, ids in enumerate(scheduled, start=1) if ids is None]
+        if len(skipped) == len(scheduled):
+            st.error("Nothing was sent: check the recipients and date.")
+            st.session_state.schedule_status = "error"
+            return
+        if skipped:
+            st.warning(f"Skipped meeting {', '.join(map(str, skipped))}: no known recipients or an unreadable date.")
         st.success("✅ Meeting invites sent successfully. Track RSVPs in the dashboard tab.")
         st.session_state.schedule_status = "success"
+    except DeliveryError as exc:
+        # Saved and queued, but nothing in this process retries the outbox.
+        st.warning(f"Meetings saved, but some invites were not sent. {exc}")
+        st.caption("Start the RSVP server (python app.py) if it isn't running; it delivers queued invites.")
+        st.session_state.schedule_status = "queued"
+    except SchedulingConflict as exc:
+        st.warning(f"Not sent: {exc}")
+        st.caption("Pick one of the free slots, or tick “Send even if invitees are busy” to override.")
+        st.session_state.schedule_status = "conflict"
     except Exception as exc:
         st.error(f"Scheduling error: {exc}")
         st.session_state.schedule_status = "error"
 
 
-def render_rsvp_dashboard():
-    st.markdown("### RSVP Dashboard")
-    logs = load_meeting_logs()
-    if not logs:
+def render_rsvp_summary():
+    live = sync_rsvp_summary()
+    totals = live["totals"]
+    if not sum(totals.values()):
         st.info("No meetings recorded yet. Send your first invite to populate this view.")
         return
 
-    df = build_rsvp_dataframe(logs)
-    status_counts = df["RSVP"].value_counts().to_dict()
     metrics = st.columns(3)
-    metrics[0].metric("Total Invites", len(df))
-    metrics[1].metric("Accepted", status_counts.get("Accepted", 0))
-    metrics[2].metric("Pending", status_counts.get("Pending", 0))
+    metrics[0].metric("Total Invites", sum(totals.values()))
+    metrics[1].metric("Accepted", totals["Accepted"])
+    metrics[2].metric("Pending", totals["Pending"])
+
+    if live["recent"]:
+        st.caption("Latest responses: " + ", ".join(f"{e['email']} → {e['new']}" for e in live["recent"]))
+
+    with st.expander("Responses by day"):
+        st.dataframe(
+            [{"Date": day, **counts} for day, counts in sorted(live["by_day"].items(), key=lambda item: str(item[0]))],
+            use_container_width=True,
+        )
+
+
+def render_rsvp_dashboard():
+    st.markdown("### RSVP Dashboard")
+    interval = st.session_state.get("dashboard_refresh_seconds", 0)
+    if interval and hasattr(st, "fragment"):
+        # Re-runs just the counters on a timer; each tick costs one delta poll.
+        st.fragment(run_every=interval)(render_rsvp_summary)()
+    else:
+        render_rsvp_summary()
+
+    store = get_store(get_config())
+    filters = st.columns([2, 2, 1, 1, 1])
+    email = filters[0].text_input("Email", key="rsvp_filter_email").strip()
+    dates = filters[1].date_input("Date range", value=(), key="rsvp_filter_dates")
+    status = filters[2].selectbox("RSVP", ["All", "Accepted", "Declined", "Pending"], key="rsvp_filter_status")
+    page_size = filters[3].selectbox("Rows", [25, 50, 100, 250], index=1, key="rsvp_page_size")
+    page = filters[4].number_input("Page", min_value=1, value=1, step=1, key="rsvp_page")
+
+    date_from = dates[0].isoformat() if len(dates) > 0 else None
+    date_to = dates[1].isoformat() if len(dates) > 1 else date_from
+    with DASHBOARD_SECONDS.time(view="page"):
+        rows, total = store.query_invites(
+            email=email or None,
+            status=None if status == "All" else status,
+            date_from=date_from,
+            date_to=date_to,
+            page=int(page),
+            page_size=page_size,
+        )
+    pages = max(1, -(-total // page_size))
+    st.caption(f"{total} matching invites · page {min(int(page), pages)} of {pages}")
+    st.dataframe(
+        [
+            {"Email": r["email"], "Date": r["date"], "Time": r["time"], "RSVP": r["status"], "Reason": r["reason"]}
+            for r in rows
+        ],
+        use_container_width=True,
+    )
 
-    st.dataframe(df, use_container_width=True)
+    if st.checkbox("Load full history (slow on large logs)", key="rsvp_full_history"):
+        st.dataframe(load_rsvp_dataframe(), use_container_width=True)
 
 
 def main():
@@ -273,6 +485,7 @@ def main():
             if st.button("🔍 Parse with Groq", use_container_width=True):
                 handle_prompt_submission()
         with col_actions[1]:
+            st.checkbox("Send even if invitees are busy", key="allow_conflicts")
             if st.button("✉️ Send Invites", use_container_width=True):
                 send_invites()
 
@@ -0,0 +1,217 @@
+"""
+Voice input: shrink microphone audio before recognition and transcribe it
+off the Streamlit script thread.
+
+`prepare_audio` decodes a mic payload (WAV bytes or raw PCM), downmixes to
+mono, trims leading/trailing silence with a frame-energy VAD and resamples
+to 16 kHz 16-bit, which is all a speech recognizer needs. Without NumPy
+the audio is passed through untouched.
+
+`submit_transcription` runs preprocessing and recognition on a small
+thread pool and returns a Future. The recognizer is `speech_backend`
+(default "google"); `speech_offline_backend` (e.g. "sphinx", "vosk" or
+"whisper") is tried when the primary one can't reach its service, or used
+alone when `speech_backend` names it.
+"""
+
+import io
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.config import get_config
+from utils.metrics import counter, histogram
+
+TARGET_RATE = 16000
+FRAME_MS = 20
+PAD_MS = 200
+# Frames this many times louder than the noise floor count as speech...
+NOISE_RATIO = 3.0
+# ...but never require more than this fraction of the loudest frame, and
+# never treat anything below MIN_LEVEL (about -46 dBFS) as speech.
+PEAK_RATIO = 0.25
+MIN_LEVEL = 0.005
+FILTER_TAPS = 63
+
+# SpeechRecognition method per backend, and whether it takes a BCP-47 language code.
+BACKENDS = {
+    "google": ("recognize_google", True),
+    "sphinx": ("recognize_sphinx", True),
+    "vosk": ("recognize_vosk", False),
+    "whisper": ("recognize_whisper", False),
+}
+
+PREPROCESS_SECONDS = histogram("audio_preprocess_seconds", "Mic audio decode, trim and resample")
+TRANSCRIBE_SECONDS = histogram("audio_transcribe_seconds", "Speech recognition latency", ["backend"])
+AUDIO_BYTES = counter("audio_bytes_total", "Mic audio bytes before and after preprocessing", ["stage"])
+
+
+def _decode(payload):
+    """(PCM bytes, sample rate, sample width, channels) from a mic payload."""
+    data = payload.get("bytes")
+    if not data:
+        raise ValueError("Microphone payload missing audio data or sample rate")
+    if data[:4] == b"RIFF":
+        with wave.open(io.BytesIO(data)) as wav:
+            return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+    sample_rate = payload.get("sample_rate") or payload.get("sampleRate")
+    sample_width = payload.get("sample_width") or payload.get("sampleWidth") or 2
+    if not sample_rate:
+        raise ValueError("Microphone payload missing audio data or sample rate")
+    return data, int(sample_rate), int(sample_width), int(payload.get("channels") or 1)
+
+
+def _to_float(pcm, width):
+    """Interleaved PCM as float32 in [-1, 1]."""
+    if width == 1:
+        return (np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if width == 3:
+        raw = np.frombuffer(pcm[: len(pcm) - len(pcm) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+        return samples.astype(np.float32) / (1 << 23)
+    dtype = {2: np.int16, 4: np.int32}.get(width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width: {width}")
+    usable = len(pcm) - len(pcm) % width
+    return np.frombuffer(pcm[:usable], dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+
+
+def downmix(samples, channels):
+    if channels <= 1:
+        return samples
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels).mean(axis=1)
+
+
+def trim_silence(samples, rate, frame_ms=FRAME_MS, pad_ms=PAD_MS):
+    """
+    Drop leading and trailing silence. Pauses inside the utterance are kept;
+    audio with no frame above the threshold is returned unchanged.
+    """
+    frame = max(1, rate * frame_ms // 1000)
+    frames = len(samples) // frame
+    if frames < 3:
+        return samples
+    rms = np.sqrt(np.mean(samples[: frames * frame].reshape(frames, frame) ** 2, axis=1))
+    noise_floor = np.percentile(rms, 10)
+    threshold = min(max(noise_floor * NOISE_RATIO, MIN_LEVEL), rms.max() * PEAK_RATIO)
+    active = np.flatnonzero(rms > threshold)
+    if not len(active):
+        return samples
+    pad = rate * pad_ms // 1000
+    start = max(0, active[0] * frame - pad)
+    end = min(len(samples), (active[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def resample(samples, rate, target_rate=TARGET_RATE):
+    """
+    Low-pass below the target Nyquist frequency (windowed-sinc FIR), then
+    decimate for integer ratios (48 kHz -> 16 kHz) or interpolate otherwise.
+    Upsampling only interpolates.
+    """
+    if rate == target_rate or not len(samples):
+        return samples
+    if rate > target_rate:
+        cutoff = target_rate / rate / 2
+        n = np.arange(FILTER_TAPS) - (FILTER_TAPS - 1) / 2
+        taps = np.sinc(2 * cutoff * n) * np.hamming(FILTER_TAPS)
+        samples = np.convolve(samples, taps / taps.sum(), mode="same").astype(np.float32)
+        if rate % target_rate == 0:
+            return samples[:: rate // target_rate]
+    length = int(round(len(samples) * target_rate / rate))
+    positions = np.arange(length) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def prepare_audio(payload, target_rate=TARGET_RATE, trim=True):
+    """
+    (PCM bytes, sample rate, sample width) ready for recognition: mono,
+    silence-trimmed, `target_rate` Hz, 16-bit. Without NumPy the decoded
+    audio is returned as is.
+    """
+    pcm, rate, width, channels = _decode(payload)
+    AUDIO_BYTES.inc(len(payload["bytes"]), stage="raw")
+    if np is None:
+        AUDIO_BYTES.inc(len(pcm), stage="prepared")
+        return pcm, rate, width
+    with PREPROCESS_SECONDS.time():
+        samples = downmix(_to_float(pcm, width), channels)
+        if trim:
+            samples = trim_silence(samples, rate)
+        samples = resample(samples, rate, target_rate)
+        prepared = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    AUDIO_BYTES.inc(len(prepared), stage="prepared")
+    return prepared, target_rate, 2
+
+
+def _recognize(recognizer, audio, backend, language):
+    method, takes_language = BACKENDS[backend]
+    with TRANSCRIBE_SECONDS.time(backend=backend):
+        if takes_language:
+            return getattr(recognizer, method)(audio, language=language)
+        return getattr(recognizer, method)(audio)
+
+
+def transcribe(payload, language="en-US", config=None):
+    """Preprocess `payload` and return the recognized text."""
+    import speech_recognition as sr
+
+    config = config or get_config()
+    backend = config.get("speech_backend", "google")
+    offline = config.get("speech_offline_backend")
+    for name in (backend, offline):
+        if name and name not in BACKENDS:
+            raise ValueError(f"Unknown speech backend {name!r}; expected one of {', '.join(BACKENDS)}")
+
+    pcm, rate, width = prepare_audio(
+        payload,
+        target_rate=int(config.get("speech_target_rate", TARGET_RATE)),
+        trim=bool(config.get("speech_trim_silence", True)),
+    )
+    audio = sr.AudioData(pcm, sample_rate=rate, sample_width=width)
+    recognizer = sr.Recognizer()
+    try:
+        return _recognize(recognizer, audio, backend, language)
+    except sr.RequestError:
+        # The online service is unreachable; an offline model still works.
+        if not offline or offline == backend:
+            raise
+        print(f"⚠️ {backend} recognizer unavailable; falling back to {offline}.")
+        return _recognize(recognizer, audio, offline, language)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def submit_transcription(payload, language="en-US"):
+    """Run `transcribe` on the shared transcription pool; returns a Future."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(get_config().get("speech_workers", 2))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="transcribe")
+    # Config is read here, on the caller's thread, so the job sees the settings it was started with.
+    return _executor.submit(transcribe, payload, language, get_config())
+
+
+def wav_bytes(pcm, rate, width=2):
+    """Wrap mono PCM in a WAV header (for saving fixtures and prepared audio)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def duration_seconds(pcm, rate, width=2, channels=1):
+    return len(pcm) / (rate * width * channels)
@@ -0,0 +1,90 @@
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class BackgroundWorker:
+    """
+    In-process worker threads fed from a bounded queue.
+
+    `submit()` never blocks: it returns False when the queue is full so the
+    caller can decide how to degrade. `shutdown()` drains queued work before
+    the process exits.
+    """
+
+    def __init__(self, name, maxsize=100, threads=1):
+        self.name = name
+        self.maxsize = maxsize
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._last_lag = 0.0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        try:
+            self._queue.put_nowait((time.monotonic(), fn, args, kwargs))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                enqueued_at, fn, args, kwargs = item
+                with self._lock:
+                    self._last_lag = time.monotonic() - enqueued_at
+                try:
+                    fn(*args, **kwargs)
+                except Exception as e:
+                    with self._lock:
+                        self._failed += 1
+                    print(f"[{self.name}] background task failed: {e}")
+                else:
+                    with self._lock:
+                        self._processed += 1
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._queue.mutex:
+            # Skip the stop markers shutdown() queues behind the real work.
+            pending = [item for item in self._queue.queue if item is not _STOP]
+            depth = len(pending)
+            oldest = pending[0][0] if pending else None
+        with self._lock:
+            return {
+                "queue_depth": depth,
+                "queue_max": self.maxsize,
+                "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest else 0.0,
+                "last_lag_seconds": round(self._last_lag, 3),
+                "processed": self._processed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, timeout=30):
+        """Let queued work finish (up to `timeout` seconds), then stop the threads."""
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            # Blocking put: the stop marker must queue behind pending work.
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,264 @@
+"""
+Schedule meetings in bulk from a CSV or JSONL request file.
+
+    python -m utils.batch requests.csv [--report report.jsonl] [--workers 4] [--dry-run]
+
+Each row is either a natural-language `prompt` (extracted with the local
+parser, the response cache or Groq, like the UI) or explicit `emails`,
+`date`, `time` and `days` fields. CSV `emails` are separated by ";".
+An optional `id` column is echoed in the report. A prompt that asks for
+several meetings is scheduled in one pass and reported as one line per
+meeting, numbered by `part`.
+
+Rows are read lazily and at most `workers` are in flight, so memory stays
+flat however long the file is. Extraction runs concurrently; scheduling is
+serialized so conflict checks see every meeting booked before them. One
+JSON line per row is appended to the report, and a checkpoint next to it
+records which rows are finished, so re-running the same command after an
+interruption resumes where it stopped. Meeting ids are derived from the
+report path and row, so a row scheduled just before a crash is recognised
+on resume instead of being booked and emailed twice.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.config import get_config
+from utils.contact_map import resolve_emails_from_names
+from utils.groq_interface import extract_meetings
+from utils.scheduler import DeliveryError, SchedulingConflict, schedule_many
+
+_FIELDS = ("emails", "date", "time", "days")
+
+
+def read_rows(path):
+    """Yield (row_number, row dict) from a CSV or JSONL file, one at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, row
+            return
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if line:
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, {"_error": f"invalid JSON: {e}"}
+
+
+class Checkpoint:
+    """
+    Finished row numbers, stored as a low-water mark plus the few finished
+    rows above it (at most the in-flight window), so it stays small.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.next_row = 1
+        self.done_above = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.next_row = state["next_row"]
+            self.done_above = set(state["done_above"])
+
+    def is_done(self, row):
+        return row < self.next_row or row in self.done_above
+
+    def mark(self, row):
+        self.done_above.add(row)
+        while self.next_row in self.done_above:
+            self.done_above.remove(self.next_row)
+            self.next_row += 1
+
+    def skip_blank(self, row):
+        """Rows the reader never yields (blank lines) still count as finished."""
+        if row >= self.next_row:
+            self.mark(row)
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"next_row": self.next_row, "done_above": sorted(self.done_above)}, f)
+        os.replace(tmp, self.path)
+
+
+def _split_emails(value):
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or "").replace(",", ";").split(";") if item.strip()]
+
+
+def extract_row(row):
+    """{"meetings": [{emails, date, time, days}, ...], "source"} for a row, or {"error": ...}."""
+    if "_error" in row:
+        return {"error": row["_error"]}
+    if row.get("prompt"):
+        return extract_meetings(row["prompt"])
+    if not any(row.get(field) for field in _FIELDS):
+        return {"error": "row has neither a prompt nor emails/date/time/days"}
+    meeting = {
+        "emails": _split_emails(row.get("emails")),
+        "date": row.get("date"),
+        "time": row.get("time"),
+        "days": row.get("days") or 1,
+    }
+    return {"meetings": [meeting], "source": "row"}
+
+
+def row_meeting_id(run_key, number, part):
+    """Stable meeting id for one meeting of one row of a batch run."""
+    return hashlib.sha1(f"{run_key}:{number}:{part}".encode()).hexdigest()[:12]
+
+
+def resolve_recipients(names_or_emails):
+    """(emails, unresolved names) using the contact directory."""
+    emails, unresolved = [], []
+    for item in names_or_emails:
+        if "@" in item:
+            emails.append(item)
+            continue
+        found = resolve_emails_from_names([item])
+        if found:
+            emails.extend(found)
+        else:
+            unresolved.append(item)
+    return list(dict.fromkeys(emails)), unresolved
+
+
+def run_batch(path, report_path=None, checkpoint_path=None, workers=None, dry_run=False):
+    """
+    Process every unfinished row of `path`; returns {status: count} for the
+    meetings handled in this run. See the module docstring for the file format.
+    """
+    suffix = "dry-run" if dry_run else "report"
+    report_path = report_path or f"{os.path.splitext(path)[0]}.{suffix}.jsonl"
+    # A dry run sends nothing, so it must not mark rows as finished.
+    checkpoint = None if dry_run else Checkpoint(checkpoint_path or f"{report_path}.checkpoint")
+    workers = max(1, int(workers or get_config().get("batch_workers", 4)))
+    schedule_lock = threading.Lock()
+    counts = {}
+    run_key = os.path.abspath(report_path)
+
+    def process(number, row):
+        """Report entries for one row: one per meeting it asks for."""
+        base = {"row": number}
+        if row.get("id"):
+            base["id"] = row["id"]
+        info = extract_row(row)
+        if "error" in info:
+            return [{**base, "status": "error", "error": info["error"]}]
+        source = info.get("source", "llm")
+        meetings = info["meetings"]
+        entries, specs = [], []  # every entry / the ones to schedule
+        for part, meeting in enumerate(meetings, start=1):
+            entry = dict(base, part=part) if len(meetings) > 1 else dict(base)
+            entries.append(entry)
+            emails, unresolved = resolve_recipients(_split_emails(meeting.get("emails")))
+            try:
+                days = int(meeting.get("days") or 1)
+            except (TypeError, ValueError):
+                entry.update(status="error", error=f"invalid days: {meeting.get('days')!r}")
+                continue
+            entry.update(emails=emails, date=meeting.get("date"), time=meeting.get("time"), days=days, source=source)
+            if unresolved:
+                entry["unresolved"] = unresolved
+            if not emails:
+                entry.update(status="error", error="no resolvable recipients")
+                continue
+            specs.append(entry)
+        if not specs:
+            return entries
+        if dry_run:
+            for entry in specs:
+                entry["status"] = "parsed"
+            return entries
+
+        try:
+            with schedule_lock:
+                results = schedule_many(
+                    [{field: entry[field] for field in _FIELDS} for entry in specs],
+                    ids=[row_meeting_id(run_key, number, entry.get("part", 1)) for entry in specs],
+                )
+        except SchedulingConflict as e:
+            suggestions = [start.strftime("%Y-%m-%d %H:%M") for start, _ in e.suggestions]
+            for entry in specs:
+                entry.update(status="conflict", error=str(e), suggestions=suggestions)
+            return entries
+        except DeliveryError as e:
+            for entry in specs:
+                entry.update(status="queued", meetings=e.meeting_ids, error=str(e))
+            return entries
+        except Exception as e:
+            for entry in specs:
+                entry.update(status="error", error=str(e))
+            return entries
+        for entry, meeting_ids in zip(specs, results):
+            if meeting_ids is None:
+                entry.update(status="error", error=f"could not parse date {entry.get('date')!r}")
+            else:
+                entry.update(status="scheduled", meetings=meeting_ids)
+        return entries
+
+    def finish(report, future, number):
+        # Runs on the reading thread only, so no locking around the files.
+        try:
+            entries = future.result()
+        except Exception as e:
+            entries = [{"row": number, "status": "error", "error": str(e)}]
+        report.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        report.flush()
+        if checkpoint is not None:
+            checkpoint.mark(number)
+            checkpoint.save()
+        for entry in entries:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+
+    with open(report_path, "a", encoding="utf-8") as report, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch"
+    ) as executor:
+        in_flight = {}
+        last_number = 0
+        for number, row in read_rows(path):
+            if checkpoint is not None:
+                for blank in range(last_number + 1, number):
+                    checkpoint.skip_blank(blank)
+                if checkpoint.is_done(number):
+                    last_number = number
+                    continue
+            last_number = number
+            if len(in_flight) >= workers:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(report, future, in_flight.pop(future))
+            in_flight[executor.submit(process, number, row)] = number
+        for future in list(in_flight):
+            finish(report, future, in_flight.pop(future))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or JSONL request file")
+    parser.add_argument("--report", help="JSONL report path (default: <input>.report.jsonl)")
+    parser.add_argument("--checkpoint", help="checkpoint path (default: <report>.checkpoint)")
+    parser.add_argument("--workers", type=int, help="rows in flight (default: batch_workers setting)")
+    parser.add_argument("--dry-run", action="store_true", help="extract and resolve only; send nothing")
+    args = parser.parse_args(argv)
+
+    counts = run_batch(args.path, args.report, args.checkpoint, args.workers, args.dry_run)
+    print(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "Nothing left to do.")
+    if counts.get("queued"):
+        print("Some invites are waiting in the outbox; they are sent once the RSVP server (app.py) is running.")
+    return 0 if not counts.get("error") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Append-only feed of scheduling / RSVP changes.
+
+Every change gets a sequence number from SQLite's AUTOINCREMENT, so the
+cursor only ever moves forward and readers can ask for "everything after
+seq N" instead of re-reading the meeting history. Only the newest
+`retention` events are kept; a reader whose cursor has fallen out of that
+window is told to `reset` (take a fresh snapshot) rather than silently
+missing events.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CHANGES_PATH = "logs/changes.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class ChangeFeed:
+    def __init__(self, path=DEFAULT_CHANGES_PATH, retention=10000):
+        self.path = path
+        self.retention = retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def append(self, kind, **fields):
+        """Record one change; returns its sequence number."""
+        return self.extend([(kind, fields)])
+
+    def extend(self, events):
+        """Record several (kind, fields) changes in one transaction; returns the last seq."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = 0
+            for kind, fields in events:
+                seq = conn.execute(
+                    "INSERT INTO changes (kind, payload, created_at) VALUES (?, ?, ?)",
+                    (kind, json.dumps(fields), now),
+                ).lastrowid
+            if seq and self.retention:
+                conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - self.retention,))
+            conn.execute("COMMIT")
+            return seq
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def cursor(self):
+        """Sequence number of the newest change (0 when nothing was recorded)."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+            return row["seq"] if row else 0
+        finally:
+            conn.close()
+
+    def since(self, seq, limit=500):
+        """
+        Changes with a sequence number above `seq`, oldest first:
+        {"cursor", "events", "more", "reset"}. Pass the returned cursor back
+        as `seq` on the next call.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            latest = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+            latest = latest["seq"] if latest else 0
+            oldest = conn.execute("SELECT MIN(seq) AS seq FROM changes").fetchone()["seq"]
+            if seq > latest or (oldest is not None and seq < oldest - 1):
+                return {"cursor": latest, "events": [], "more": False, "reset": True}
+            rows = conn.execute(
+                "SELECT seq, kind, payload, created_at FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        events = [
+            {"seq": row["seq"], "kind": row["kind"], "at": row["created_at"], **json.loads(row["payload"])}
+            for row in rows
+        ]
+        cursor = events[-1]["seq"] if events else seq
+        return {"cursor": cursor, "events": events, "more": cursor < latest, "reset": False}
+
+
+_FEEDS = {}
+_FEEDS_LOCK = threading.Lock()
+
+
+def get_change_feed(config):
+    """Shared `ChangeFeed` for the `changes_*` settings in config.json."""
+    path = config.get("changes_path", DEFAULT_CHANGES_PATH)
+    with _FEEDS_LOCK:
+        if path not in _FEEDS:
+            _FEEDS[path] = ChangeFeed(path, retention=int(config.get("changes_retention", 10000)))
+        return _FEEDS[path]
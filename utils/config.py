@@ -0,0 +1,105 @@
+"""
+Shared, lazily loaded application config.
+
+`get_config()` parses config.json once, validates it, and re-reads it only
+when the file's mtime or size changes. Set MEET_SCHEDULER_CONFIG to use a
+different file.
+"""
+
+import json
+import os
+import threading
+
+DEFAULT_CONFIG_PATH = "config.json"
+REQUIRED_KEYS = ("sender_email", "sender_password")
+NUMERIC_KEYS = (
+    "smtp_port",
+    "smtp_pool_size",
+    "smtp_messages_per_connection",
+    "smtp_workers",
+    "smtp_rate_per_sec",
+    "smtp_burst",
+    "flask_port",
+    "followup_queue_size",
+    "outbox_max_attempts",
+    "outbox_retry_base_seconds",
+    "outbox_poll_seconds",
+    "groq_cache_size",
+    "groq_cache_ttl_seconds",
+    "groq_connect_timeout_seconds",
+    "groq_read_timeout_seconds",
+    "groq_max_retries",
+    "groq_max_concurrency",
+    "local_parser_threshold",
+    "changes_retention",
+    "rsvp_coalesce_ms",
+    "dashboard_refresh_seconds",
+    "meeting_duration_minutes",
+    "contact_match_threshold",
+    "batch_workers",
+    "profile_sample_rate",
+    "profile_slow_ms",
+    "speech_target_rate",
+    "speech_workers",
+)
+STORAGE_BACKENDS = ("json", "sqlite", "partitioned")
+# Example values that must never be used as a real RSVP signing key.
+PLACEHOLDER_SECRETS = ("change-me-random-string",)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+_lock = threading.Lock()
+_cached = {"path": None, "stamp": None, "config": None}
+
+
+def config_path():
+    return os.getenv("MEET_SCHEDULER_CONFIG", DEFAULT_CONFIG_PATH)
+
+
+def validate_config(config):
+    """Raise ConfigError listing every problem found in `config`."""
+    problems = [f"missing '{key}'" for key in REQUIRED_KEYS if not config.get(key)]
+    for key in NUMERIC_KEYS:
+        value = config.get(key)
+        if value is None:
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            problems.append(f"'{key}' must be a number, got {value!r}")
+    if config.get("rsvp_secret") in PLACEHOLDER_SECRETS:
+        problems.append("'rsvp_secret' is the example placeholder; set a long random string")
+    backend = config.get("storage_backend", "json")
+    if backend not in STORAGE_BACKENDS:
+        problems.append(f"'storage_backend' must be one of {', '.join(STORAGE_BACKENDS)}, got {backend!r}")
+    if problems:
+        raise ConfigError("Invalid config: " + "; ".join(problems))
+
+
+def get_config():
+    """Return the validated config dict, reloading it if the file changed."""
+    path = config_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise ConfigError(f"Config file not found: {path} (copy config.example.json to get started)")
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        if _cached["path"] == path and _cached["stamp"] == stamp:
+            return _cached["config"]
+        with open(path) as f:
+            config = json.load(f)
+        validate_config(config)
+        _cached.update(path=path, stamp=stamp, config=config)
+        return config
+
+
+def reload_config():
+    """Drop the cached copy so the next `get_config()` re-reads the file."""
+    with _lock:
+        _cached.update(path=None, stamp=None, config=None)
+    return get_config()
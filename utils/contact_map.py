@@ -1,3 +1,27 @@
+"""
+Contact directory used to turn names in prompts into email addresses.
+
+Contacts come from `contacts_path` in config.json (CSV or JSON, see
+contacts.example.json) and fall back to the built-in CONTACTS. The file is
+re-read whenever its mtime or size changes.
+
+CSV columns: name, email, aliases, groups (aliases/groups separated by
+";"). JSON: {"contacts": [{"name", "email", "aliases", "groups"}],
+"groups": {"group-name": [names or emails]}}, or a plain {name: email}
+object.
+
+Names resolve by exact name/alias, then group, then a unique prefix, then
+the closest trigram match, all through indexes built once per load.
+"""
+
+import csv
+import json
+import os
+import threading
+from bisect import bisect_left
+
+from utils.config import get_config
+
 CONTACTS = {
     "nishanth": "nishanthmanikandhan@gmail.com",
     "teja": "tejagangumalla476@gmail.com",
@@ -5,5 +29,174 @@ CONTACTS = {
     "jayanth":"jayanthanbu1242@gmail.com"
 }
 
+DEFAULT_CONTACTS_PATH = "contacts.json"
+DEFAULT_MATCH_THRESHOLD = 0.5
+
+
+def _normalize(name):
+    return " ".join(str(name).lower().replace("_", " ").split())
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _split(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or "").split(";") if item.strip()]
+
+
+class ContactDirectory:
+    """
+    Read-only name -> emails index. `names` maps every normalized name,
+    alias, unambiguous first name and group to its list of emails.
+    """
+
+    def __init__(self, contacts=(), groups=None, threshold=DEFAULT_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.names = {}
+        first_names = {}
+        member_groups = {}
+        for contact in contacts:
+            email = contact["email"].strip()
+            for name in [contact.get("name", "")] + _split(contact.get("aliases")):
+                key = _normalize(name)
+                if key:
+                    self.names.setdefault(key, [])
+                    if email not in self.names[key]:
+                        self.names[key].append(email)
+                    first_names.setdefault(key.split(" ")[0], set()).add(email)
+            for group in _split(contact.get("groups")):
+                member_groups.setdefault(_normalize(group), []).append(email)
+
+        # "john" finds "John Smith" as long as only one contact is called John.
+        for first, emails in first_names.items():
+            if len(emails) == 1 and first not in self.names:
+                self.names[first] = list(emails)
+
+        for group, emails in member_groups.items():
+            self.names.setdefault(group, list(dict.fromkeys(emails)))
+        # Explicit groups may list emails, contact names or other groups.
+        for group, members in (groups or {}).items():
+            resolved = list(self.names.get(_normalize(group), []))
+            for member in members:
+                resolved.extend([member] if "@" in member else self.names.get(_normalize(member), []))
+            self.names[_normalize(group)] = list(dict.fromkeys(resolved))
+
+        self._sorted = sorted(self.names)
+        self._grams = {}
+        self._gram_counts = {}
+        for key in self._sorted:
+            grams = _trigrams(key)
+            self._gram_counts[key] = len(grams)
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """Emails for an exact name, alias or group (empty list if unknown)."""
+        return self.names.get(_normalize(name), [])
+
+    def complete(self, prefix, limit=10):
+        """Known names starting with `prefix`, alphabetically."""
+        prefix = _normalize(prefix)
+        start = bisect_left(self._sorted, prefix)
+        matches = []
+        for key in self._sorted[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+        return matches
+
+    def fuzzy(self, name, limit=5):
+        """(name, score) pairs ranked by trigram similarity (Dice coefficient)."""
+        grams = _trigrams(_normalize(name))
+        shared = {}
+        for gram in grams:
+            for key in self._grams.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        scored = [
+            (key, 2 * count / (len(grams) + self._gram_counts[key]))
+            for key, count in shared.items()
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def resolve(self, name):
+        """Best-effort emails for `name`: exact, unique prefix, then fuzzy."""
+        exact = self.lookup(name)
+        if exact:
+            return exact
+        completions = self.complete(name, limit=2) if len(_normalize(name)) >= 3 else []
+        if len(completions) == 1:
+            return self.names[completions[0]]
+        best = self.fuzzy(name, limit=2)
+        if best and best[0][1] >= self.threshold and (len(best) == 1 or best[0][1] > best[1][1]):
+            return self.names[best[0][0]]
+        return []
+
+
+def _load_file(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return [row for row in rows if row.get("email")], {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "contacts" not in data and "groups" not in data:
+        return [{"name": name, "email": email} for name, email in data.items()], {}
+    return [c for c in data.get("contacts", []) if c.get("email")], data.get("groups", {})
+
+
+_lock = threading.Lock()
+_cached = {"key": None, "directory": None}
+
+
+def get_directory(config=None):
+    """
+    Shared `ContactDirectory` for `contacts_path`, rebuilt when the file
+    changes. Without a contacts file the built-in CONTACTS are used.
+    """
+    if config is None:
+        try:
+            config = get_config()
+        except ValueError:
+            config = {}
+    path = config.get("contacts_path", DEFAULT_CONTACTS_PATH)
+    threshold = float(config.get("contact_match_threshold", DEFAULT_MATCH_THRESHOLD))
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, threshold)
+    except FileNotFoundError:
+        key = (None, None, None, threshold)
+
+    with _lock:
+        if _cached["key"] == key:
+            return _cached["directory"]
+        if key[0] is None:
+            contacts, groups = [{"name": n, "email": e} for n, e in CONTACTS.items()], {}
+        else:
+            try:
+                contacts, groups = _load_file(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ Could not load contacts from {path}: {e}")
+                if _cached["directory"] is not None:
+                    # Keep serving the last good copy until the file changes again.
+                    _cached["key"] = key
+                    return _cached["directory"]
+                contacts, groups = [{"name": n, "email": e} for n, e in CONTACTS.items()], {}
+        directory = ContactDirectory(contacts, groups, threshold)
+        _cached.update(key=key, directory=directory)
+        return directory
+
+
 def resolve_emails_from_names(names):
-    return [CONTACTS[name] for name in names if name in CONTACTS]
+    directory = get_directory()
+    emails = []
+    for name in names:
+        emails.extend(directory.resolve(name))
+    return list(dict.fromkeys(emails))
@@ -1,6 +1,92 @@
+import queue
 import smtplib
+import threading
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from utils.metrics import counter, histogram
+
+# Rough per-connection message caps before providers start throttling or
+# dropping the session. Unknown hosts fall back to DEFAULT_MESSAGES_PER_CONNECTION.
+PROVIDER_MESSAGE_CAPS = {
+    "smtp.gmail.com": 100,
+    "smtp.office365.com": 30,
+    "smtp-mail.outlook.com": 30,
+    "smtp.mail.yahoo.com": 50,
+}
+DEFAULT_MESSAGES_PER_CONNECTION = 100
+
+SMTP_SECONDS = histogram("smtp_seconds", "SMTP latency by phase", ["phase"])
+SMTP_ERRORS = counter("smtp_errors_total", "SMTP failures by phase", ["phase"])
+SMTP_RECONNECTS = counter("smtp_reconnects_total", "Sends retried after the server dropped the connection")
+
+
+def _attachment_part(filename, content_type, content):
+    maintype, _, subtype = content_type.partition("/")
+    params = dict(p.strip().split("=", 1) for p in subtype.split(";")[1:] if "=" in p)
+    subtype = subtype.split(";")[0]
+    if maintype == "text":
+        part = MIMEText(content, subtype, "utf-8")
+    else:
+        part = MIMEApplication(content.encode() if isinstance(content, str) else content, subtype)
+    for name, value in params.items():
+        part.set_param(name, value)
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part
+
+
+def _build_message(recipient, subject, body, sender_email, attachments=None):
+    """
+    Plain-text message, or multipart/mixed when `attachments` — a list of
+    (filename, content_type, content) — is given.
+    """
+    if attachments:
+        msg = MIMEMultipart("mixed")
+        msg.attach(MIMEText(body))
+        for filename, content_type, content in attachments:
+            msg.attach(_attachment_part(filename, content_type, content))
+    else:
+        msg = MIMEText(body)
+    msg["Subject"] = subject
+    msg["From"] = sender_email
+    msg["To"] = recipient
+    return msg
+
+
+def _open_connection(sender_email, sender_password, smtp_server, smtp_port, timeout=30):
+    """Connect, negotiate TLS where applicable and log in."""
+    try:
+        with SMTP_SECONDS.time(phase="connect"):
+            if smtp_port == 465:
+                server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=timeout)
+            else:
+                server = smtplib.SMTP(smtp_server, smtp_port, timeout=timeout)
+                server.ehlo()
+                if smtp_port == 587:
+                    server.starttls()
+                    server.ehlo()
+    except Exception:
+        SMTP_ERRORS.inc(phase="connect")
+        raise
+    try:
+        with SMTP_SECONDS.time(phase="login"):
+            server.login(sender_email, sender_password)
+    except Exception:
+        SMTP_ERRORS.inc(phase="login")
+        server.close()
+        raise
+    return server
+
+
+def _sendmail(server, sender_email, recipient, msg):
+    try:
+        with SMTP_SECONDS.time(phase="send"):
+            server.sendmail(sender_email, [recipient], msg.as_string())
+    except Exception:
+        SMTP_ERRORS.inc(phase="send")
+        raise
+
 
 def send_email(
     recipient,
@@ -10,31 +96,175 @@ def send_email(
     sender_password,
     smtp_server: str = "smtp.gmail.com",
     smtp_port: int = 465,
+    attachments=None,
 ):
     """
-    Send a plain-text email via SMTP.
+    Send a plain-text email via SMTP, optionally with (filename,
+    content_type, content) attachments.
 
     Defaults target Gmail's SMTP (Workspace or consumer). For other providers,
     pass the appropriate `smtp_server` and `smtp_port`.
     - Port 465: implicit SSL (SMTP_SSL)
     - Port 587: STARTTLS
     - Other ports: plain SMTP (if provider allows)
+
+    Opens a fresh connection per call; use `SMTPPool` when sending more than
+    a handful of messages.
     """
 
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = sender_email
-    msg["To"] = recipient
+    msg = _build_message(recipient, subject, body, sender_email, attachments)
+    with _open_connection(sender_email, sender_password, smtp_server, smtp_port) as server:
+        _sendmail(server, sender_email, recipient, msg)
 
-    if smtp_port == 465:
-        with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, [recipient], msg.as_string())
-    else:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.ehlo()
-            if smtp_port == 587:
-                server.starttls()
-                server.ehlo()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, [recipient], msg.as_string())
+
+class SMTPSession:
+    """
+    A single authenticated SMTP connection reused across sends.
+
+    The connection is opened lazily, re-established once if the server drops
+    it (`SMTPServerDisconnected`) and recycled after `max_messages` sends.
+    """
+
+    def __init__(
+        self,
+        sender_email,
+        sender_password,
+        smtp_server: str = "smtp.gmail.com",
+        smtp_port: int = 465,
+        max_messages: int = None,
+        timeout: int = 30,
+    ):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server = smtp_server
+        self.smtp_port = int(smtp_port)
+        self.max_messages = max_messages or PROVIDER_MESSAGE_CAPS.get(
+            smtp_server, DEFAULT_MESSAGES_PER_CONNECTION
+        )
+        self.timeout = timeout
+        self._server = None
+        self._sent_on_connection = 0
+
+    def _connect(self):
+        self.close()
+        self._server = _open_connection(
+            self.sender_email,
+            self.sender_password,
+            self.smtp_server,
+            self.smtp_port,
+            self.timeout,
+        )
+        self._sent_on_connection = 0
+
+    def send(self, recipient, subject, body, attachments=None):
+        msg = _build_message(recipient, subject, body, self.sender_email, attachments)
+        if self._server is None or self._sent_on_connection >= self.max_messages:
+            self._connect()
+        try:
+            _sendmail(self._server, self.sender_email, recipient, msg)
+        except smtplib.SMTPServerDisconnected:
+            # Idle connections get dropped by most providers; retry once.
+            SMTP_RECONNECTS.inc()
+            self._connect()
+            _sendmail(self._server, self.sender_email, recipient, msg)
+        self._sent_on_connection += 1
+
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SMTPPool:
+    """
+    Keeps up to `size` authenticated `SMTPSession`s alive and hands them out
+    to callers. Safe to share between threads.
+
+        with SMTPPool(sender, password, server, port, size=4) as pool:
+            pool.send(recipient, subject, body)
+    """
+
+    def __init__(
+        self,
+        sender_email,
+        sender_password,
+        smtp_server: str = "smtp.gmail.com",
+        smtp_port: int = 465,
+        size: int = 2,
+        max_messages: int = None,
+        timeout: int = 30,
+    ):
+        self.size = max(1, int(size))
+        self._session_args = (sender_email, sender_password, smtp_server, int(smtp_port), max_messages, timeout)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return SMTPSession(*self._session_args)
+        return self._idle.get()
+
+    def send(self, recipient, subject, body, attachments=None):
+        session = self._acquire()
+        try:
+            session.send(recipient, subject, body, attachments)
+        except smtplib.SMTPServerDisconnected:
+            session.close()
+            raise
+        except smtplib.SMTPException:
+            # The server rejected this message (bad recipient, content...);
+            # the connection itself is still good.
+            raise
+        except OSError:
+            # Leave the pool with a clean connection rather than a half-broken one.
+            session.close()
+            raise
+        finally:
+            self._idle.put(session)
+
+    def close(self):
+        """Close idle sessions; ones checked out by other threads stay counted."""
+        closed = 0
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            closed += 1
+        with self._lock:
+            self._created -= closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pool_from_config(config, size=None):
+    """Build an `SMTPPool` from the smtp_* / sender_* settings in config.json."""
+    return SMTPPool(
+        config["sender_email"],
+        config["sender_password"],
+        config.get("smtp_server", "smtp.gmail.com"),
+        int(config.get("smtp_port", 465)),
+        size=size or int(config.get("smtp_pool_size", 2)),
+        max_messages=config.get("smtp_messages_per_connection"),
+    )
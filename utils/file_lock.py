@@ -0,0 +1,83 @@
+"""
+Cross-process locking and crash-safe replacement for the JSON meeting logs.
+
+Several gunicorn workers (or the dashboard and the RSVP server) can share
+one log file. Writers hold an exclusive `flock` on a sidecar "<path>.lock"
+file for the whole read-modify-write, and new contents are written to a
+temporary file, fsynced and renamed over the old one, so readers (which
+take no lock) always see either the old or the new file, never a partial
+one. Without `fcntl` (Windows) only threads of one process are serialized.
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every thread and process that uses `path`.
+    Reentrant within a thread, so store methods can nest.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.RLock()
+        self._fd = None
+        self._depth = 0
+
+    def __enter__(self):
+        self._local.acquire()
+        if self._depth == 0:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._local.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            # Closing the descriptor drops the flock.
+            os.close(fd)
+        self._local.release()
+
+
+def replace_file(path, data):
+    """
+    Atomically replace `path` with `data` (bytes), written to a temporary
+    file next to it. The data is fsynced before the rename and the
+    directory after it, so once this returns the write survives a crash.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
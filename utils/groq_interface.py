@@ -1,81 +1,325 @@
+import datetime
 import os
-import requests
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-with open("config.json") as f:
-    config = json.load(f)
+from utils.config import get_config
+from utils.incremental_json import IncrementalObjectParser
+from utils.llm_cache import ResponseCache, make_key
+from utils.local_parser import extract_meeting_info_local
+from utils.metrics import counter, histogram
+
+TEMPERATURE = 0.2
+DEFAULT_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+MEETING_FIELDS = ("emails", "date", "time", "days")
+
+SYSTEM_PROMPT = (
+    "Extract meeting scheduling details. Reply with JSON only, no explanation:\n"
+    '{"meetings": [{"emails": ["name or email"], "date": "YYYY-MM-DD", "time": "HH:MM", "days": 1}]}\n'
+    "One entry per separate meeting, in the order mentioned. time is 24-hour; "
+    "days is the number of consecutive days (1 unless stated)."
+)
+
+GROQ_SECONDS = histogram("groq_request_seconds", "Groq call latency, including retries", ["mode"])
+GROQ_RESPONSES = counter("groq_responses_total", "Groq responses by HTTP status", ["mode", "status"])
+EXTRACTIONS = counter("meeting_extractions_total", "Meeting extractions by where the answer came from", ["source"])
+
+
+def _api_key():
+    # Prefer environment variable to avoid committing secrets
+    return os.getenv("GROQ_API_KEY") or get_config().get("groq_api_key", "")
+
+
+def _model():
+    return get_config().get("groq_model", "llama3-8b-8192")
+
+
+def _post(stream=False, **kwargs):
+    config = get_config()
+    timeout = (
+        float(config.get("groq_connect_timeout_seconds", 5)),
+        float(config.get("groq_read_timeout_seconds", 30)),
+    )
+    url = config.get("groq_api_url", DEFAULT_API_URL)
+    return _get_session().post(url, timeout=timeout, stream=stream, **kwargs)
+
+
+_cache = None
+_session = None
+_lazy_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide `ResponseCache`, created on first use."""
+    global _cache
+    with _lazy_lock:
+        if _cache is None:
+            config = get_config()
+            _cache = ResponseCache(
+                maxsize=int(config.get("groq_cache_size", 256)),
+                ttl=float(config.get("groq_cache_ttl_seconds", 6 * 3600)),
+                disk_path=config.get("groq_cache_path"),
+            )
+        return _cache
+
+
+def _get_session():
+    """
+    Shared keep-alive session. Retries 429/5xx with exponential backoff and
+    honours Retry-After; POST is retried because extraction is idempotent.
+    """
+    global _session
+    with _lazy_lock:
+        if _session is None:
+            # requests/urllib3 are imported on first use to keep startup fast.
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            config = get_config()
+            retry = Retry(
+                total=int(config.get("groq_max_retries", 3)),
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=int(config.get("groq_max_concurrency", 4)),
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _as_meetings(result):
+    """
+    Normalize an extraction to {"meetings": [{emails, date, time, days}, ...], ...}.
+    A bare single-meeting object (older cache entries, or a model that
+    ignored the list schema) is wrapped; error dicts pass through.
+    """
+    if "error" in result:
+        return result
+    meetings = result.get("meetings")
+    if meetings is None and "emails" in result:
+        meetings = [{field: result.get(field) for field in MEETING_FIELDS}]
+    if not isinstance(meetings, list) or not meetings or not all(isinstance(m, dict) for m in meetings):
+        return {"error": "Model output did not contain any meetings."}
+    return {**{k: v for k, v in result.items() if k not in MEETING_FIELDS}, "meetings": meetings}
+
+
+def _fast_path(user_input):
+    """
+    Return (result, cache_key). `result` is set when the local parser is
+    confident enough (tagged "source": "local") or the cache has an answer.
+    """
+    local = extract_meeting_info_local(user_input)
+    # Local parses at or above this confidence skip Groq; set above 1 to disable.
+    if local["confidence"] >= float(get_config().get("local_parser_threshold", 0.8)):
+        EXTRACTIONS.inc(source="local")
+        meeting = {field: local[field] for field in MEETING_FIELDS}
+        return {"meetings": [meeting], "source": "local", "confidence": local["confidence"]}, None
+
+    key = make_key(user_input, _model(), TEMPERATURE, datetime.date.today().isoformat())
+    cached = get_cache().get(key)
+    EXTRACTIONS.inc(source="groq" if cached is None else "cache")
+    return (None if cached is None else _as_meetings(cached)), key
+
+
+def extract_meetings(user_input):
+    """
+    Extract every meeting in a natural-language request with at most one
+    Groq call: {"meetings": [{emails, date, time, days}, ...]}, or a dict
+    with an "error" key.
+
+    Simple prompts are handled by the local parser (result tagged
+    "source": "local"). Everything else goes to Groq; successful results are
+    cached per normalized prompt, model, temperature and today's date, and
+    errors are never cached.
+    """
+    result, key = _fast_path(user_input)
+    if result is not None:
+        return result
+
+    result = _call_groq(user_input)
+    if "error" not in result:
+        get_cache().set(key, result)
+    return result
+
+
+def _first_meeting(result):
+    """The first meeting's {emails, date, time, days} (plus "source" when set), or the error dict."""
+    if "error" in result:
+        return result
+    first = dict(result["meetings"][0])
+    if "source" in result:
+        first["source"] = result["source"]
+    return first
 
-# Prefer environment variable to avoid committing secrets
-API_KEY = os.getenv("GROQ_API_KEY") or config.get("groq_api_key", "")
-MODEL = config.get("groq_model", "llama3-8b-8192")
 
 def extract_meeting_info(user_input):
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
+    """Single-meeting view of `extract_meetings`, kept for existing callers."""
+    return _first_meeting(extract_meetings(user_input))
+
+
+def extract_meetings_many(prompts, max_concurrency=None):
+    """
+    Run `extract_meetings` over many prompts concurrently (at most
+    `max_concurrency` Groq calls in flight). Results keep the input order.
+    """
+    prompts = list(prompts)
+    limit = max_concurrency or int(get_config().get("groq_max_concurrency", 4))
+    workers = max(1, min(limit, len(prompts) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq") as executor:
+        return list(executor.map(extract_meetings, prompts))
+
+
+def extract_meeting_info_many(prompts, max_concurrency=None):
+    """Single-meeting view of `extract_meetings_many`, kept for existing callers."""
+    return [_first_meeting(result) for result in extract_meetings_many(prompts, max_concurrency)]
+
+
+def stream_meetings(user_input):
+    """
+    Streaming variant of `extract_meetings`.
+
+    Yields ("field", index, name, value) as each field of the meeting being
+    parsed completes, ("meeting", spec) as each meeting in the model's answer
+    completes, then exactly one ("result", dict) event; the dict has an
+    "error" key on failure. Local-parser and cache hits are replayed
+    straight away. Malformed model output aborts the stream early.
+    """
+    result, key = _fast_path(user_input)
+    if result is not None:
+        yield from _replay(result)
+        return
 
-    prompt = f"""
-Extract the following details from this message:
-- List of emails
-- Start date (YYYY-MM-DD)
-- Time (HH:MM 24hr format)
-- Number of days
+    result = yield from _stream_groq(user_input)
+    if "error" not in result:
+        get_cache().set(key, result)
+    yield ("result", result)
 
-Message: "{user_input}"
 
-Return ONLY this JSON structure (no explanation):
-{{
-  "emails": ["email1@example.com", "email2@example.com"],
-  "date": "YYYY-MM-DD",
-  "time": "HH:MM",
-  "days": <number>
-}}
-"""
+def _replay(result):
+    for meeting in result["meetings"]:
+        yield ("meeting", meeting)
+    yield ("result", result)
+
+
+MISSING_KEY_ERROR = (
+    "Missing GROQ API key. Set environment variable 'GROQ_API_KEY' "
+    "or add 'groq_api_key' to config.json."
+)
+
+
+def _build_request(user_input, stream=False):
+    headers = {
+        "Authorization": f"Bearer {_api_key()}",
+        "Content-Type": "application/json"
+    }
 
+    # The instructions are a fixed system message so every request shares
+    # the same prefix; the user turn carries only the date and the message.
+    today = datetime.date.today()
     data = {
-        "model": MODEL,
+        "model": _model(),
         "messages": [
-            {"role": "system", "content": "You are a helpful assistant that extracts meeting scheduling info."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Today: {today.isoformat()} ({today:%A})\nMessage: {user_input}"}
         ],
-        "temperature": 0.2
+        "temperature": TEMPERATURE
     }
+    if stream:
+        data["stream"] = True
+    return headers, data
 
+
+def _error_from_response(response):
+    """Turn a non-200 Groq response into an error dict with clearer messages."""
+    try:
+        err_json = response.json()
+    except Exception:
+        err_json = {"raw": response.text}
+
+    # Special-case 401 for clearer guidance
+    if response.status_code == 401:
+        return {
+            "error": (
+                "Groq API Error 401: Invalid or missing API key. "
+                "Verify your 'GROQ_API_KEY' and that it has not been revoked."
+            ),
+            "details": err_json,
+        }
+
+    return {"error": f"Groq API Error {response.status_code}", "details": err_json}
+
+
+def _stream_groq(user_input):
+    """Generator yielding "field" and "meeting" events; its return value is the final result dict."""
+    if not _api_key():
+        return {"error": MISSING_KEY_ERROR}
+
+    headers, data = _build_request(user_input, stream=True)
+    parser = IncrementalObjectParser(item_keys=("meetings",))
+    start = time.perf_counter()
     try:
-        if not API_KEY:
-            return {
-                "error": (
-                    "Missing GROQ API key. Set environment variable 'GROQ_API_KEY' "
-                    "or add 'groq_api_key' to config.json."
-                )
-            }
+        with _post(stream=True, headers=headers, json=data) as response:
+            GROQ_RESPONSES.inc(mode="stream", status=response.status_code)
+            if response.status_code != 200:
+                return _error_from_response(response)
 
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+            # Server-sent events: "data: {chunk}" lines, terminated by "data: [DONE]".
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                delta = json.loads(payload)["choices"][0].get("delta", {}).get("content") or ""
+                for name, value in parser.feed(delta):
+                    if name == "meetings":
+                        yield ("meeting", value)
+                    elif isinstance(name, tuple) and name[0] == "meetings":
+                        yield ("field", name[1], name[2], value)
+                if parser.done:
+                    # Stop reading; closing the response drops the rest of the completion.
+                    break
+    except ValueError as e:
+        return {"error": f"Aborted: model returned malformed output ({e})."}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        # Covers the whole stream, not just the time to first byte.
+        GROQ_SECONDS.observe(time.perf_counter() - start, mode="stream")
+
+    if not parser.done:
+        return {"error": "Failed to extract JSON from model output."}
+    return _as_meetings(dict(parser.fields))
+
+
+def _call_groq(user_input):
+    headers, data = _build_request(user_input)
+
+    try:
+        if not _api_key():
+            return {"error": MISSING_KEY_ERROR}
 
-        # Debug info (safe)
-        print("Groq API Response Code:", response.status_code)
+        with GROQ_SECONDS.time(mode="blocking"):
+            response = _post(headers=headers, json=data)
+        GROQ_RESPONSES.inc(mode="blocking", status=response.status_code)
 
         # Handle non-200s with clearer messages
         if response.status_code != 200:
-            try:
-                err_json = response.json()
-            except Exception:
-                err_json = {"raw": response.text}
-
-            # Special-case 401 for clearer guidance
-            if response.status_code == 401:
-                return {
-                    "error": (
-                        "Groq API Error 401: Invalid or missing API key. "
-                        "Verify your 'GROQ_API_KEY' and that it has not been revoked."
-                    ),
-                    "details": err_json,
-                }
-
-            return {"error": f"Groq API Error {response.status_code}", "details": err_json}
+            return _error_from_response(response)
 
         result = response.json()
         content = result["choices"][0]["message"]["content"]
@@ -83,7 +327,7 @@ Return ONLY this JSON structure (no explanation):
         # Extract and parse the JSON from the content
         match = re.search(r'\{.*\}', content, re.DOTALL)
         if match:
-            return json.loads(match.group())
+            return _as_meetings(json.loads(match.group()))
         else:
             return {"error": "Failed to extract JSON from model output."}
 
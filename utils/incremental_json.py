@@ -0,0 +1,151 @@
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalObjectParser:
+    """
+    Parse a single JSON object as it streams in, emitting each top-level
+    field as soon as its value is complete.
+
+        parser = IncrementalObjectParser()
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+
+    Text before the opening brace (e.g. "Here is the JSON:") is skipped, up
+    to `max_preamble` characters. Anything that cannot be the continuation of
+    a JSON object raises ValueError so callers can abort the stream early.
+
+    Keys in `item_keys` hold arrays of objects: each element is emitted as
+    (key, element) as soon as it closes, and the whole array is only stored
+    in `fields`. While an element is still open, each of its fields is
+    emitted as ((key, index, field), value) once the comma after it arrives;
+    the last field only arrives with the element itself.
+    """
+
+    def __init__(self, max_preamble=300, item_keys=()):
+        self.max_preamble = max_preamble
+        self.item_keys = frozenset(item_keys)
+        self.fields = {}
+        self.done = False
+        self._state = "preamble"
+        self._skipped = 0
+        self._chars = []
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_array = False
+        self._item_start = None
+        self._item_index = -1
+        self._field_start = None
+
+    def feed(self, chunk):
+        emitted = []
+        for char in chunk:
+            if self.done:
+                break
+            field = self._step(char)
+            if field is not None:
+                emitted.append(field)
+        return emitted
+
+    def _step(self, char):
+        state = self._state
+
+        if state == "preamble":
+            if char == "{":
+                self._state = "key_wait"
+            else:
+                self._skipped += 1
+                if self._skipped > self.max_preamble:
+                    raise ValueError("no JSON object found in model output")
+            return None
+
+        if state == "key_wait":
+            if char in _WHITESPACE or char == ",":
+                return None
+            if char == '"':
+                self._state = "key"
+                self._chars = []
+                return None
+            if char == "}":
+                self.done = True
+                return None
+            raise ValueError(f"unexpected {char!r} where a key was expected")
+
+        if state == "key":
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._key = json.loads('"' + "".join(self._chars) + '"')
+                self._state = "colon"
+                return None
+            self._chars.append(char)
+            return None
+
+        if state == "colon":
+            if char == ":":
+                self._state = "value"
+                self._chars = []
+                self._depth = 0
+            elif char not in _WHITESPACE:
+                raise ValueError(f"unexpected {char!r} after key {self._key!r}")
+            return None
+
+        # state == "value"
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            self._in_string = True
+        elif char in "[{":
+            self._depth += 1
+            if self._depth == 1:
+                self._in_array = char == "["
+                self._item_index = -1
+            elif self._depth == 2 and char == "{" and self._in_array and self._key in self.item_keys:
+                self._item_start = len(self._chars)
+                self._field_start = self._item_start + 1
+                self._item_index += 1
+        elif char == "," and self._depth == 2 and self._item_start is not None:
+            text = "".join(self._chars[self._field_start:])
+            self._chars.append(char)
+            self._field_start = len(self._chars)
+            try:
+                ((name, value),) = json.loads("{" + text + "}").items()
+            except (json.JSONDecodeError, ValueError) as e:
+                raise ValueError(f"invalid field in {self._key!r}: {e}") from e
+            return (self._key, self._item_index, name), value
+        elif char in "]}" and self._depth > 0:
+            self._depth -= 1
+            if char == "}" and self._depth == 1 and self._item_start is not None:
+                text = "".join(self._chars[self._item_start:]) + char
+                self._item_start = None
+                self._chars.append(char)
+                try:
+                    return self._key, json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"invalid item in {self._key!r}: {e}") from e
+        elif char in ",}" and self._depth == 0:
+            try:
+                value = json.loads("".join(self._chars))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"invalid value for {self._key!r}: {e}") from e
+            self.fields[self._key] = value
+            if char == "}":
+                self.done = True
+            else:
+                self._state = "key_wait"
+            if self._key in self.item_keys and isinstance(value, list):
+                return None
+            return self._key, value
+        self._chars.append(char)
+        return None
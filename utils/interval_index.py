@@ -0,0 +1,201 @@
+"""
+Per-attendee interval index over stored meetings.
+
+Each attendee's meetings are kept as parallel lists sorted by start time
+(minutes since 0001-01-01), so overlap checks and "busy until" lookups are
+a couple of bisects plus a scan over the few meetings that can actually
+overlap, independent of how long the history is. Declined invites don't
+count as busy.
+
+    index = get_index(store, duration_minutes=30)
+    index.conflicts(["a@x.com"], start, end)        # [(email, meeting_id)]
+    index.find_free_slots(["a@x.com", "b@x.com"], (start, end), 30)
+"""
+
+import datetime
+import threading
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from operator import itemgetter
+
+from utils.invites import parse_time
+from utils.rsvp_stats import status_of
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def _to_minutes(moment):
+    return moment.toordinal() * _MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _from_minutes(minutes):
+    day, minute = divmod(minutes, _MINUTES_PER_DAY)
+    return datetime.datetime.combine(datetime.date.fromordinal(day), datetime.time(minute // 60, minute % 60))
+
+
+def meeting_start(meeting):
+    """Start of a stored meeting as a datetime, or None if its date/time can't be read."""
+    start_time = parse_time(meeting.get("time"))
+    try:
+        day = datetime.date.fromisoformat(meeting.get("date") or "")
+    except ValueError:
+        return None
+    if start_time is None:
+        return None
+    return datetime.datetime.combine(day, start_time)
+
+
+@lru_cache(maxsize=65536)
+def _start_minutes(date, time):
+    # Many meetings share a date/time pair; parsing dominates a full rebuild.
+    start = meeting_start({"date": date, "time": time})
+    return None if start is None else _to_minutes(start)
+
+
+class AttendeeCalendar:
+    __slots__ = ("starts", "ends", "ids", "max_length")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.max_length = 0
+
+    def add(self, start, end, meeting_id):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, meeting_id)
+        self.max_length = max(self.max_length, end - start)
+
+    def _overlapping(self, start, end):
+        # Nothing starting at or before `start - max_length` can reach `start`.
+        lo = bisect_right(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [i for i in range(lo, hi) if self.ends[i] > start]
+
+    def busy_until(self, start, end):
+        """Latest end among meetings overlapping [start, end), or None when free."""
+        hits = self._overlapping(start, end)
+        return max(self.ends[i] for i in hits) if hits else None
+
+    def conflicts(self, start, end):
+        return [self.ids[i] for i in self._overlapping(start, end)]
+
+
+class IntervalIndex:
+    def __init__(self, duration_minutes=30):
+        self.duration = int(duration_minutes)
+        self._calendars = {}
+
+    @classmethod
+    def from_meetings(cls, meetings, duration_minutes=30):
+        index = cls(duration_minutes)
+        pending = {}
+        for meeting in meetings:
+            for email, interval in index._intervals(meeting):
+                pending.setdefault(email, []).append(interval)
+        # Bulk build: sort each attendee once instead of inserting one by one.
+        for email, intervals in pending.items():
+            intervals.sort(key=itemgetter(0, 1))
+            calendar = AttendeeCalendar()
+            calendar.starts = [start for start, _, _ in intervals]
+            calendar.ends = [end for _, end, _ in intervals]
+            calendar.ids = [meeting_id for _, _, meeting_id in intervals]
+            calendar.max_length = max(end - start for start, end, _ in intervals)
+            index._calendars[email] = calendar
+        return index
+
+    def _intervals(self, meeting):
+        start = _start_minutes(meeting.get("date"), meeting.get("time"))
+        if start is None:
+            return []
+        interval = (start, start + self.duration, meeting.get("id"))
+        emails = meeting.get("emails", [])
+        rsvp = meeting.get("rsvp")
+        if rsvp:
+            emails = [email for email in emails if status_of(rsvp.get(email)) != "Declined"]
+        return [(email, interval) for email in emails]
+
+    def add_meeting(self, meeting):
+        for email, (start, end, meeting_id) in self._intervals(meeting):
+            self._calendars.setdefault(email, AttendeeCalendar()).add(start, end, meeting_id)
+
+    def conflicts(self, attendees, start, end):
+        """(email, meeting_id) for every existing meeting overlapping [start, end)."""
+        start, end = _to_minutes(start), _to_minutes(end)
+        found = []
+        for email in attendees:
+            calendar = self._calendars.get(email)
+            if calendar is not None:
+                found.extend((email, meeting_id) for meeting_id in calendar.conflicts(start, end))
+        return found
+
+    def find_free_slots(self, attendees, window, duration, limit=3, hours=None):
+        """
+        Earliest `limit` (start, end) datetimes inside `window` (a (start,
+        end) pair) where every attendee is free for `duration` minutes.
+        `hours` = (first_hour, last_hour) keeps slots within working hours.
+
+        The candidate start only ever moves forward, jumping straight to the
+        end of whichever meeting blocks it, so the cost depends on the
+        meetings inside the window rather than the whole history.
+        """
+        duration = int(duration.total_seconds() // 60) if isinstance(duration, datetime.timedelta) else int(duration)
+        if hours is not None and duration > (hours[1] - hours[0]) * 60:
+            raise ValueError("duration is longer than the working day")
+        calendars = [self._calendars[email] for email in attendees if email in self._calendars]
+        t, stop = _to_minutes(window[0]), _to_minutes(window[1])
+        slots = []
+        while t + duration <= stop and len(slots) < limit:
+            if hours is not None:
+                day, minute = divmod(t, _MINUTES_PER_DAY)
+                if minute < hours[0] * 60:
+                    t = day * _MINUTES_PER_DAY + hours[0] * 60
+                    continue
+                if minute + duration > hours[1] * 60:
+                    t = (day + 1) * _MINUTES_PER_DAY + hours[0] * 60
+                    continue
+            for calendar in calendars:
+                until = calendar.busy_until(t, t + duration)
+                if until is not None:
+                    t = until
+                    break
+            else:
+                slots.append((_from_minutes(t), _from_minutes(t + duration)))
+                t += duration
+        return slots
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(store, duration_minutes=30):
+    """
+    Shared `IntervalIndex` for `store`, rebuilt only when `store.version()`
+    changes (or is unknown). It holds meetings from the start of the current
+    month on: conflicts and free slots are only ever looked up from today
+    forward, and older history needn't be read.
+    """
+    since = datetime.date.today().replace(day=1).isoformat()
+    version = (store.version(), since)
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(store)
+        if cached and version[0] is not None and cached[0] == version and cached[1].duration == duration_minutes:
+            return cached[1]
+        index = IntervalIndex.from_meetings(store.meetings_since(since), duration_minutes)
+        _INDEXES[store] = (version, index)
+        return index
+
+
+def index_added(store, meetings):
+    """Fold meetings this process just wrote to `store` into its cached index."""
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(store)
+        if not cached:
+            return
+        index = cached[1]
+        for meeting in meetings:
+            index.add_meeting(meeting)
+        _INDEXES[store] = ((store.version(), cached[0][1]), index)
@@ -0,0 +1,136 @@
+"""
+Invite email rendering.
+
+Bodies come from `string.Template`s compiled once at import. A single
+meeting gets the classic one-message-per-occurrence invite; in digest mode
+each recipient gets one message listing every occurrence with its own RSVP
+links, plus a multi-event .ics attachment.
+"""
+
+import datetime
+from string import Template
+
+INVITE_SUBJECT = "Meeting Invite with RSVP"
+DIGEST_SUBJECT = Template("Meeting Invites with RSVP ($count sessions)")
+ICS_FILENAME = "invite.ics"
+ICS_CONTENT_TYPE = "text/calendar; method=PUBLISH"
+
+INVITE_TEMPLATE = Template("""\
+Hi $email,
+
+You're invited to a meeting on $date at $time.
+
+Please RSVP below:
+✅ Accept: $accept_link
+❌ Decline: $decline_link
+
+Best,
+AI Scheduler Bot
+""")
+
+DIGEST_TEMPLATE = Template("""\
+Hi $email,
+
+You're invited to $count sessions at $time. Please RSVP to each one:
+
+$sessions
+The attached calendar file adds all of them at once.
+
+Best,
+AI Scheduler Bot
+""")
+
+DIGEST_LINE_TEMPLATE = Template("""\
+📅 $date
+   ✅ Accept: $accept_link
+   ❌ Decline: $decline_link
+""")
+
+_TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I %p", "%I:%M%p", "%I%p")
+
+
+def render_invite(email, date, time, accept_link, decline_link):
+    """(subject, body) for a single meeting."""
+    body = INVITE_TEMPLATE.substitute(
+        email=email, date=date, time=time, accept_link=accept_link, decline_link=decline_link
+    )
+    return INVITE_SUBJECT, body
+
+
+def render_digest(email, time, sessions):
+    """(subject, body) listing `sessions` — (date, accept_link, decline_link) tuples."""
+    lines = "\n".join(
+        DIGEST_LINE_TEMPLATE.substitute(date=date, accept_link=accept, decline_link=decline)
+        for date, accept, decline in sessions
+    )
+    subject = DIGEST_SUBJECT.substitute(count=len(sessions))
+    body = DIGEST_TEMPLATE.substitute(email=email, count=len(sessions), time=time, sessions=lines)
+    return subject, body
+
+
+def parse_time(value):
+    """datetime.time for strings like "14:30", "2:30 PM" or "2pm"; None otherwise."""
+    text = str(value).strip().upper()
+    try:
+        return datetime.time.fromisoformat(text)  # fast path for the usual "HH:MM"
+    except ValueError:
+        pass
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def _ics_escape(text):
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Split content lines longer than 75 octets, as RFC 5545 requires."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        size = 75 if not parts else 74
+        while size and (data[size:size + 1] and (data[size] & 0xC0) == 0x80):
+            size -= 1  # never split a UTF-8 sequence
+        parts.append(data[:size].decode())
+        data = data[size:]
+    return "\r\n ".join(parts)
+
+
+def build_ics(meetings, duration_minutes=30, organizer=None, links=None):
+    """
+    One VCALENDAR with a VEVENT per meeting dict. Times that can't be parsed
+    become all-day events. `links` maps meeting id to a URL for that event.
+    """
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//AI Meeting Scheduler//EN",
+        "METHOD:PUBLISH",
+    ]
+    for meeting in meetings:
+        day = datetime.date.fromisoformat(meeting["date"])
+        start_time = parse_time(meeting.get("time"))
+        lines += ["BEGIN:VEVENT", f"UID:{meeting['id']}@ai-meeting-scheduler", f"DTSTAMP:{stamp}"]
+        if start_time is None:
+            lines.append(f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}")
+        else:
+            start = datetime.datetime.combine(day, start_time)
+            end = start + datetime.timedelta(minutes=duration_minutes)
+            lines += [f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}", f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}"]
+        lines.append("SUMMARY:Meeting")
+        if organizer:
+            lines.append(f"ORGANIZER:mailto:{organizer}")
+        if links and links.get(meeting["id"]):
+            lines.append(f"DESCRIPTION:{_ics_escape('RSVP: ' + links[meeting['id']])}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,122 @@
+"""
+Memoization for LLM extraction results.
+
+Two tiers: an in-memory LRU and an optional SQLite file that survives
+process restarts. Entries expire after `ttl` seconds in both tiers.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """Case-fold and collapse whitespace so trivial edits share a cache entry."""
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+def make_key(prompt, model, temperature, reference_date):
+    """
+    Cache key for one extraction. `reference_date` is part of the key because
+    relative phrases like "tomorrow" resolve differently on another day.
+    """
+    raw = json.dumps(
+        [normalize_prompt(prompt), model, float(temperature), str(reference_date)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, maxsize=256, ttl=6 * 3600, disk_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.disk_path, timeout=10)
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._memory[key]
+                self.evictions += 1
+
+        if self.disk_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] <= now:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+            if row:
+                value = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self.disk_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._memory),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
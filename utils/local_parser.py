@@ -0,0 +1,204 @@
+"""
+Deterministic, offline extraction for simple scheduling prompts.
+
+Handles requests like "invite teja and anto tomorrow at 15:00 for 3 days"
+with regular expressions, the contact directory and (for month-name dates)
+dateparser. Returns the same {emails, date, time, days} shape as
+`groq_interface.extract_meeting_info` plus a `confidence` score in [0, 1];
+callers fall back to the LLM when the score is low.
+"""
+
+import datetime
+import re
+
+from utils.contact_map import get_directory
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|november|december"
+    "|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec"
+)
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+RELATIVE_DAY_RE = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b")
+IN_DAYS_RE = re.compile(r"\bin\s+(\d+|" + "|".join(_NUMBER_WORDS) + r")\s+days?\b")
+WEEKDAY_RE = re.compile(r"\b(?:(next|this|coming|on)\s+)?(" + "|".join(_WEEKDAYS) + r")\b")
+MONTH_DATE_RE = re.compile(
+    rf"\b(?:\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTHS})|(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?)"
+    r"(?:,?\s+\d{4})?\b"
+)
+SLASH_DATE_RE = re.compile(r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b")
+
+CLOCK_TIME_RE = re.compile(r"\b(\d{1,2}):(\d{2})\s*(am|pm|a\.m\.|p\.m\.)?")
+MERIDIEM_TIME_RE = re.compile(r"(?<![:\d])\b(\d{1,2})\s*(am|pm|a\.m\.|p\.m\.)")
+BARE_TIME_RE = re.compile(r"\bat\s+(\d{1,2})\b(?!\s*(?:days?|/|:|-))")
+NAMED_TIME_RE = re.compile(r"\b(noon|midday|midnight)\b")
+
+DAYS_RE = re.compile(
+    r"\bfor\s+(?:the\s+next\s+)?(\d+|" + "|".join(_NUMBER_WORDS) + r"|a)\s+(?:consecutive\s+)?(days?|weeks?)\b"
+)
+# Phrases that usually mean more than one meeting, or a recurrence we
+# can't express as a simple day count; leave those to the LLM.
+COMPOUND_RE = re.compile(
+    r"\b(also|another|separately|then|every|daily|weekly|each|next week)\b|\band an?\b|;"
+)
+# Words that introduce attendees; an unknown word right after one is most
+# likely a name we failed to resolve.
+ATTENDEE_LEAD_RE = re.compile(r"\b(?:invite|with|and|cc|add)\s+([a-z][a-z'-]*)")
+_NOT_NAMES = {
+    "a", "an", "and", "the", "me", "us", "them", "him", "her", "my", "our", "everyone",
+    "at", "on", "for", "tomorrow", "today", "tonight", "next", "this", "from",
+    *_WEEKDAYS,
+}
+
+
+def _number(text):
+    if text == "a":
+        return 1
+    if text.isdigit():
+        return int(text)
+    return _NUMBER_WORDS.get(text)
+
+
+def _next_weekday(base, weekday, skip_this_week=False):
+    ahead = (weekday - base.weekday()) % 7
+    if skip_this_week and ahead == 0:
+        ahead = 7
+    return base + datetime.timedelta(days=ahead)
+
+
+def _find_dates(text, today):
+    """Return (dates, ambiguous) where dates are the distinct dates mentioned."""
+    found = []
+    ambiguous = False
+
+    for match in ISO_DATE_RE.finditer(text):
+        try:
+            found.append(datetime.date(*map(int, match.groups())))
+        except ValueError:
+            pass
+
+    offsets = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}
+    for match in RELATIVE_DAY_RE.finditer(text):
+        found.append(today + datetime.timedelta(days=offsets[match.group(1)]))
+
+    for match in IN_DAYS_RE.finditer(text):
+        found.append(today + datetime.timedelta(days=_number(match.group(1))))
+
+    for match in WEEKDAY_RE.finditer(text):
+        qualifier, name = match.groups()
+        weekday = _WEEKDAYS.index(name)
+        if qualifier == "next":
+            # "next friday" is read as the first friday after today.
+            ambiguous = True
+        found.append(_next_weekday(today, weekday, skip_this_week=qualifier == "next"))
+
+    written = [m.group(0) for m in MONTH_DATE_RE.finditer(text)]
+    written += [m.group(0) for m in SLASH_DATE_RE.finditer(text)]
+    if written:
+        import dateparser
+
+        base = datetime.datetime.combine(today, datetime.time())
+        settings = {"PREFER_DATES_FROM": "future", "RELATIVE_BASE": base}
+        for phrase in written:
+            parsed = dateparser.parse(phrase, settings=settings)
+            if parsed:
+                found.append(parsed.date())
+        if any("/" in phrase for phrase in written):
+            ambiguous = True  # day/month order is locale dependent
+
+    return sorted(set(found)), ambiguous
+
+
+def _find_times(text):
+    """Return (times as "HH:MM", weak) where weak means the hour had no am/pm or minutes."""
+    found = []
+    weak = False
+
+    def to_24h(hour, minute, meridiem):
+        if meridiem:
+            meridiem = meridiem.replace(".", "")
+            if hour == 12:
+                hour = 0
+            if meridiem == "pm":
+                hour += 12
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            found.append(f"{hour:02d}:{minute:02d}")
+
+    for match in CLOCK_TIME_RE.finditer(text):
+        to_24h(int(match.group(1)), int(match.group(2)), match.group(3))
+    for match in MERIDIEM_TIME_RE.finditer(text):
+        to_24h(int(match.group(1)), 0, match.group(2))
+    for match in NAMED_TIME_RE.finditer(text):
+        found.append("00:00" if match.group(1) == "midnight" else "12:00")
+    if not found:
+        for match in BARE_TIME_RE.finditer(text):
+            hour = int(match.group(1))
+            # Office hours guess: "at 3" means 15:00, "at 10" means 10:00.
+            to_24h(hour + 12 if 1 <= hour <= 7 else hour, 0, None)
+            weak = True
+
+    return list(dict.fromkeys(found)), weak
+
+
+def _find_recipients(text, contacts):
+    emails = EMAIL_RE.findall(text)
+    without_emails = EMAIL_RE.sub(" ", text)
+    words = re.findall(r"[a-z][a-z'-]*", without_emails)
+    for word in words:
+        if word in contacts:
+            found = contacts[word]
+            emails.extend([found] if isinstance(found, str) else found)
+    unknown = [
+        word
+        for word in ATTENDEE_LEAD_RE.findall(without_emails)
+        if word not in contacts and word not in _NOT_NAMES
+    ]
+    return list(dict.fromkeys(emails)), unknown
+
+
+def extract_meeting_info_local(user_input, today=None, contacts=None):
+    """
+    Parse `user_input` without any network calls.
+
+    Always returns a dict with `emails`, `date`, `time`, `days` (any of which
+    may be None when not found) and `confidence`.
+    """
+    today = today or datetime.date.today()
+    contacts = get_directory().names if contacts is None else contacts
+    text = user_input.lower()
+
+    emails, unknown_names = _find_recipients(text, contacts)
+    dates, ambiguous_date = _find_dates(text, today)
+    times, weak_time = _find_times(text)
+
+    days = 1
+    days_match = DAYS_RE.search(text)
+    if days_match:
+        count = _number(days_match.group(1)) or 1
+        days = count * 7 if days_match.group(2).startswith("week") else count
+
+    confidence = 0.0
+    if emails:
+        confidence += 0.35
+    if len(dates) == 1:
+        confidence += 0.15 if ambiguous_date else 0.3
+    if len(times) == 1:
+        confidence += 0.15 if weak_time else 0.25
+    confidence += 0.1  # days always has a usable value (explicit or 1)
+    confidence -= 0.25 * len(unknown_names)
+    if len(dates) > 1 or len(times) > 1 or COMPOUND_RE.search(text):
+        confidence = min(confidence, 0.4)
+
+    return {
+        "emails": emails,
+        "date": dates[0].isoformat() if dates else None,
+        "time": times[0] if times else None,
+        "days": days,
+        "confidence": round(max(0.0, min(1.0, confidence)), 2),
+    }
@@ -0,0 +1,203 @@
+"""
+Resident, compact copy of the meeting log for the RSVP server.
+
+Meeting dicts from the store cost several hundred bytes per invitee
+(one dict entry per RSVP, a fresh string for every email). `MeetingIndex`
+keeps one `MeetingRecord` per meeting instead: interned email tuples,
+RSVP statuses as a byte array, and a side table only for the rare values
+a status code can't represent (decline reasons). It maps
+meeting id -> record and email -> records, so the RSVP routes answer
+lookups without walking the log.
+
+The index is loaded once and then follows the change feed: "scheduled"
+and "rsvp" events are applied in place, and anything else (bulk RSVPs, a
+feed reset) triggers a reload. Without a feed it reloads whenever
+`store.version()` changes.
+"""
+
+import sys
+import threading
+from array import array
+
+from utils.metrics import counter
+from utils.rsvp_stats import STATUSES, status_of
+
+PENDING = STATUSES.index("Pending")
+_CODES = {status: code for code, status in enumerate(STATUSES)}
+_CORE_FIELDS = frozenset(("id", "emails", "date", "time", "rsvp"))
+
+INDEX_SYNCS = counter("meeting_index_syncs_total", "Meeting index updates by kind", ["kind"])
+
+
+def _encode(value):
+    """
+    (status code, extra) for a stored RSVP value: extra is None, a reason
+    string for {"status", "reason"} values, or the value itself when it
+    doesn't fit either shape.
+    """
+    if value is None:
+        return PENDING, None
+    if isinstance(value, str) and value in _CODES:
+        return _CODES[value], None
+    status = status_of(value)
+    if isinstance(value, dict) and status in _CODES and set(value) <= {"status", "reason"}:
+        reason = value.get("reason")
+        return _CODES[status], None if reason is None else sys.intern(reason)
+    return _CODES.get(status, PENDING), value
+
+
+class MeetingRecord:
+    __slots__ = ("id", "date", "time", "emails", "statuses", "raw", "extra")
+
+    def __init__(self, meeting_id, date, time, emails):
+        self.id = meeting_id
+        self.date = date
+        self.time = time
+        self.emails = tuple(sys.intern(email) for email in emails)
+        self.statuses = array("B", [PENDING]) * len(self.emails)
+        self.raw = None
+        self.extra = None
+
+    @classmethod
+    def from_meeting(cls, meeting):
+        date, time = meeting.get("date"), meeting.get("time")
+        record = cls(
+            meeting.get("id"),
+            sys.intern(date) if isinstance(date, str) else date,
+            sys.intern(time) if isinstance(time, str) else time,
+            meeting.get("emails", []),
+        )
+        rsvp = meeting.get("rsvp") or {}
+        for email, value in rsvp.items():
+            record.set(email, value)
+        extra = {key: value for key, value in meeting.items() if key not in _CORE_FIELDS}
+        record.extra = extra or None
+        return record
+
+    def set(self, email, value):
+        """Store an RSVP value for `email`; False if they weren't invited."""
+        try:
+            position = self.emails.index(email)
+        except ValueError:
+            return False
+        code, raw = _encode(value)
+        self.statuses[position] = code
+        if raw is not None:
+            if self.raw is None:
+                self.raw = {}
+            self.raw[self.emails[position]] = raw
+        elif self.raw is not None:
+            self.raw.pop(email, None)
+        return True
+
+    def status(self, email):
+        try:
+            return STATUSES[self.statuses[self.emails.index(email)]]
+        except ValueError:
+            return None
+
+    def to_dict(self):
+        """The meeting in the store's dict shape."""
+        raw = self.raw or {}
+        rsvp = {}
+        for email, code in zip(self.emails, self.statuses):
+            extra = raw.get(email)
+            if isinstance(extra, str):
+                rsvp[email] = {"status": STATUSES[code], "reason": extra}
+            elif extra is not None:
+                rsvp[email] = extra
+            else:
+                rsvp[email] = None if code == PENDING else STATUSES[code]
+        meeting = {"id": self.id, "emails": list(self.emails), "date": self.date, "time": self.time, "rsvp": rsvp}
+        if self.extra:
+            meeting.update(self.extra)
+        return meeting
+
+
+class MeetingIndex:
+    def __init__(self, store, feed=None):
+        self.store = store
+        self.feed = feed
+        self._lock = threading.RLock()
+        # (meeting id -> record, email -> records). Reloads build new maps
+        # and swap the pair in at once, so lock-free readers never see a
+        # half-built index.
+        self._maps = ({}, {})
+        self._cursor = None
+        self._version = None
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._maps[0])
+
+    @staticmethod
+    def _add(maps, record):
+        by_id, by_email = maps
+        for email in record.emails:
+            by_email.setdefault(email, []).append(record)
+        by_id[record.id] = record
+
+    def load(self):
+        """Rebuild from `store.all_meetings()`."""
+        with self._lock:
+            # Take the cursor first: events that land while the store is read
+            # are replayed afterwards, and replaying them is harmless.
+            cursor = self.feed.cursor() if self.feed is not None else None
+            version = self.store.version()
+            maps = ({}, {})
+            for meeting in self.store.all_meetings():
+                self._add(maps, MeetingRecord.from_meeting(meeting))
+            self._maps = maps
+            self._cursor, self._version, self._loaded = cursor, version, True
+            INDEX_SYNCS.inc(kind="load")
+
+    def sync(self):
+        """Catch up with changes made since the last call (by any process)."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+                return
+            if self.feed is None:
+                version = self.store.version()
+                if version is None or version != self._version:
+                    self.load()
+                return
+            while True:
+                changes = self.feed.since(self._cursor, limit=5000)
+                if changes["reset"] or not all(self._apply(event) for event in changes["events"]):
+                    self.load()
+                    return
+                self._cursor = changes["cursor"]
+                if not changes["more"]:
+                    return
+
+    def _apply(self, event):
+        kind = event.get("kind")
+        if kind == "scheduled":
+            if event.get("meeting_id") not in self._maps[0]:
+                meeting = {key: event.get(key) for key in ("date", "time", "emails")}
+                self._add(self._maps, MeetingRecord.from_meeting({"id": event.get("meeting_id"), **meeting}))
+        elif kind == "rsvp":
+            record = self._maps[0].get(event.get("meeting_id"))
+            if record is None or not record.set(event.get("email"), event.get("new")):
+                return False
+        else:
+            return False
+        INDEX_SYNCS.inc(kind=kind)
+        return True
+
+    def get_meeting(self, meeting_id):
+        record = self._maps[0].get(meeting_id)
+        return record.to_dict() if record is not None else None
+
+    def status(self, meeting_id, email):
+        """RSVP status of `email` for one meeting, or None if unknown."""
+        record = self._maps[0].get(meeting_id)
+        return record.status(email) if record is not None else None
+
+    def meeting_ids_for(self, email):
+        return [record.id for record in self._maps[1].get(email, ())]
+
+    def latest_meeting_for(self, email):
+        records = self._maps[1].get(email)
+        return records[-1].to_dict() if records else None
@@ -0,0 +1,1237 @@
+"""
+Storage backends for scheduled meetings and their RSVPs.
+
+Meetings are exchanged as plain dicts in the same shape the JSON log has
+always used:
+
+    {"id": "...", "emails": [...], "date": "YYYY-MM-DD", "time": "HH:MM",
+     "rsvp": {email: None | "Accepted" | "Declined" | {"status", "reason"}}}
+
+Recurring meetings may be added as a single series record instead (see
+utils/recurrence.py); reads expand them into one meeting per occurrence
+with ids "<series id>:<date>".
+
+`JsonMeetingStore` keeps the original single-file layout for small installs
+and stores series records as-is, with sparse per-occurrence RSVPs.
+`SqliteMeetingStore` stores meetings, invitees and RSVPs in separate indexed
+tables so RSVP updates are single-row transactional writes; series are
+expanded into occurrence rows when inserted. `PartitionedJsonStore` splits
+the JSON log into monthly files so day-to-day work only reads the current
+and future months.
+
+Migrate an existing log with:
+
+    python -m utils.meeting_store migrate [logs/meeting_logs.json] [logs/meetings.db]
+
+or import it into (and re-compact) the partitioned layout with:
+
+    python -m utils.meeting_store compact [logs/meeting_logs.json] [logs/meetings]
+"""
+
+import datetime
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from utils.file_lock import FileLock, replace_file
+from utils.recurrence import (
+    expand,
+    is_series,
+    iter_meetings,
+    occurrence,
+    occurrence_dates,
+    split_occurrence_id,
+)
+from utils.metrics import counter, histogram
+from utils.rsvp_stats import RsvpCounters, status_of, summarize
+from utils.write_coalescer import WriteCoalescer
+
+DEFAULT_JSON_PATH = "logs/meeting_logs.json"
+DEFAULT_SQLITE_PATH = "logs/meetings.db"
+DEFAULT_PARTITION_DIR = "logs/meetings"
+DEFAULT_COALESCE_WINDOW = 0.005
+
+LOG_SECONDS = histogram("meeting_log_seconds", "Meeting log reads and writes", ["backend", "op"])
+LOG_CACHE = counter("meeting_log_cache_total", "JSON log reads served from the parsed copy", ["result"])
+
+
+def new_meeting_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _decode_rsvp(status, reason):
+    if status is None:
+        return None
+    if reason is not None:
+        return {"status": status, "reason": reason}
+    return status
+
+
+def _encode_rsvp(value):
+    """Split an RSVP value into (status, reason) columns."""
+    if isinstance(value, dict):
+        return value.get("status", "Declined"), value.get("reason")
+    return value, None
+
+
+def _find_meeting(entries, meeting_id):
+    """Flat meeting `meeting_id` among raw log entries (series occurrences included), or None."""
+    for meeting in entries:
+        if meeting.get("id") == meeting_id and not is_series(meeting):
+            return meeting
+    parts = split_occurrence_id(meeting_id)
+    if parts:
+        for entry in entries:
+            if is_series(entry) and entry.get("id") == parts[0]:
+                return occurrence(entry, parts[1])
+    return None
+
+
+def _set_response(entry, date, email, response, counters):
+    """
+    Store `response` on a flat entry, or on one date of a series. Returns
+    the change-feed event for it, whose "meeting_id" is the updated meeting.
+    """
+    if date is None:
+        rsvp = entry.setdefault("rsvp", {})
+        entry.setdefault("id", new_meeting_id())
+        meeting = entry
+    else:
+        rsvp = entry.setdefault("rsvp", {}).setdefault(date, {})
+        meeting = occurrence(entry, date)
+    old = rsvp.get(email)
+    if counters is not None:
+        counters.change(meeting, old, response)
+    rsvp[email] = response
+    return _rsvp_event(meeting, email, old, response)
+
+
+def _rsvp_event(meeting, email, old, new):
+    fields = {"meeting_id": meeting["id"], "email": email, "date": meeting.get("date")}
+    return "rsvp", dict(fields, old=status_of(old), new=status_of(new))
+
+
+def _scheduled_events(meetings):
+    """"scheduled" change-feed events for newly stored entries, series expanded."""
+    return [
+        ("scheduled", {"meeting_id": m["id"], "date": m.get("date"), "time": m.get("time"), "emails": m.get("emails", [])})
+        for meeting in meetings
+        for m in expand(meeting)
+    ]
+
+
+def _publish(events):
+    """Append queued (feed, event) pairs, one feed transaction per feed."""
+    batches = {}
+    for feed, event in events:
+        batches.setdefault(id(feed), (feed, []))[1].append(event)
+    for feed, batch in batches.values():
+        feed.extend(batch)
+
+
+def _find_pending(entries, email, meeting_id):
+    """(entry, date) that record_rsvp should update; date is None for flat entries."""
+    parts = split_occurrence_id(meeting_id)
+    for entry in entries:
+        if email not in entry.get("emails", []):
+            continue
+        if is_series(entry):
+            if meeting_id is not None:
+                if parts and entry.get("id") == parts[0] and parts[1] in occurrence_dates(entry):
+                    return entry, parts[1]
+                continue
+            answered = entry.get("rsvp") or {}
+            for date in occurrence_dates(entry):
+                if (answered.get(date) or {}).get(email) is None:
+                    return entry, date
+        elif meeting_id is not None:
+            if entry.get("id") == meeting_id:
+                return entry, None
+        elif (entry.get("rsvp") or {}).get(email) is None:
+            return entry, None
+    return None, None
+
+
+def _matching_invites(meetings, email=None, status=None, date_from=None, date_to=None):
+    """`query_invites` rows for every invite in `meetings` matching the filters."""
+    for meeting in meetings:
+        date = meeting.get("date") or ""
+        if (date_from and date < date_from) or (date_to and date > date_to):
+            continue
+        if email and email not in meeting.get("emails", []):
+            continue
+        rsvp = meeting.get("rsvp") or {}
+        for invitee in meeting.get("emails", []):
+            if email and invitee != email:
+                continue
+            value = rsvp.get(invitee)
+            if status and status_of(value) != status:
+                continue
+            yield {
+                "meeting_id": meeting.get("id"),
+                "email": invitee,
+                "date": meeting.get("date"),
+                "time": meeting.get("time"),
+                "status": status_of(value),
+                "reason": (value.get("reason") or "") if isinstance(value, dict) else "",
+            }
+
+
+def _file_stamp(path):
+    """Changes whenever `path` is rewritten, including by another process (new inode)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _read_json_file(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json_file(path, data):
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    replace_file(path, gzip.compress(payload) if path.endswith(".gz") else payload)
+
+
+class MeetingStore:
+    """Interface shared by the storage backends."""
+
+    def add_meetings(self, meetings, feed=None):
+        """
+        Persist new meetings or series records, assigning ids where missing.
+        Returns the ids. With a change `feed`, a "scheduled" event per stored
+        occurrence is appended before the store's write lock is released.
+        """
+        raise NotImplementedError
+
+    def all_meetings(self):
+        """Return every meeting in insertion order, series expanded into occurrences."""
+        raise NotImplementedError
+
+    def get_meeting(self, meeting_id):
+        raise NotImplementedError
+
+    def meetings_since(self, date):
+        """Meetings on or after `date` (YYYY-MM-DD), series expanded; undated ones are skipped."""
+        return [meeting for meeting in self.all_meetings() if (meeting.get("date") or "") >= date]
+
+    def stored_occurrences(self, meeting_id):
+        """Occurrences stored under a flat meeting or series id, oldest first; [] if none."""
+        return [
+            meeting for meeting in self.all_meetings()
+            if meeting.get("id") == meeting_id or meeting.get("series_id") == meeting_id
+        ]
+
+    def version(self):
+        """
+        Cheap token that changes whenever stored data changes, for callers
+        that cache derived views. None means "unknown, always rebuild".
+        """
+        return None
+
+    def latest_meeting_for(self, email):
+        """Most recently scheduled meeting `email` is invited to, or None."""
+        raise NotImplementedError
+
+    def record_rsvp(self, email, response, meeting_id=None, feed=None):
+        """
+        Store `response` for `email`. With `meeting_id`, only that meeting is
+        updated; otherwise the oldest meeting still pending for `email` is.
+        Returns the updated meeting id, or None if nothing matched. With a
+        change `feed`, the "rsvp" event (old status read under the same lock)
+        is appended before the lock is released, so concurrent clicks can't
+        both report the same transition.
+        """
+        raise NotImplementedError
+
+    def set_rsvp_all(self, email, response, feed=None):
+        """Overwrite `email`'s RSVP on every meeting it is invited to; see `record_rsvp` for `feed`."""
+        raise NotImplementedError
+
+    def snapshot(self, feed):
+        """
+        (feed cursor, summary()) describing the same state. Backends that
+        append to the feed under their write lock read both under it too;
+        this fallback retries while the cursor moves.
+        """
+        for _ in range(3):
+            cursor = feed.cursor()
+            summary = self.summary()
+            if feed.cursor() == cursor:
+                break
+        return cursor, summary
+
+    def summary(self):
+        """
+        Pre-aggregated counts: {"totals": {status: n}, "by_day": {date: {status: n}}}
+        with status one of Accepted / Declined / Pending.
+        """
+        raise NotImplementedError
+
+    def meeting_counts(self, meeting_id):
+        """{status: n} for one meeting."""
+        raise NotImplementedError
+
+    def query_invites(self, email=None, status=None, date_from=None, date_to=None, page=1, page_size=50):
+        """
+        One page of invites, newest meeting first, filtered by exact email,
+        status and an inclusive YYYY-MM-DD date range. Returns (rows, total)
+        where each row is {"meeting_id", "email", "date", "time", "status",
+        "reason"} and `total` counts every match.
+        """
+        raise NotImplementedError
+
+
+class JsonMeetingStore(MeetingStore):
+    """
+    The whole history as one JSON list; every write rewrites the file.
+
+    The parsed list is cached and reused until the file changes, so
+    repeated reads (e.g. dashboard reruns) skip the JSON parse. Writers
+    build a new list rather than growing the cached one, and
+    `all_meetings()` hands out its own copy of the list; the meeting dicts
+    in it are shared and must be treated as read-only.
+
+    Writers hold a cross-process lock (see utils/file_lock.py) and replace
+    the file atomically, so several server workers can share it. RSVPs
+    arriving within `coalesce_window` seconds of each other are applied
+    with a single rewrite; each `record_rsvp` call returns once the write
+    holding its change is on disk.
+    """
+
+    def __init__(self, path=DEFAULT_JSON_PATH, coalesce_window=DEFAULT_COALESCE_WINDOW):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{path}.lock")
+        self._rsvps = WriteCoalescer(self._record_rsvps, coalesce_window, name="json_rsvp")
+        self._cached = None
+        self._cached_stamp = None
+        self._counters = None
+        self._counters_stamp = None
+        self._expanded = None
+        self._expanded_stamp = None
+
+    def _stamp(self):
+        return _file_stamp(self.path)
+
+    def version(self):
+        return self._stamp()
+
+    def _read(self):
+        stamp = self._stamp()
+        if stamp is None:
+            return []
+        if stamp == self._cached_stamp:
+            LOG_CACHE.inc(result="hit")
+            return self._cached
+        LOG_CACHE.inc(result="miss")
+        with LOG_SECONDS.time(backend="json", op="read"), open(self.path, "r") as f:
+            try:
+                meetings = json.load(f)
+            except json.JSONDecodeError:
+                print("❌ Could not parse meeting log file.")
+                return []
+        self._cached, self._cached_stamp = meetings, stamp
+        return meetings
+
+    def _write(self, meetings):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._cached_stamp = None
+        with LOG_SECONDS.time(backend="json", op="write"):
+            replace_file(self.path, json.dumps(meetings, indent=4).encode("utf-8"))
+        self._cached, self._cached_stamp = meetings, self._stamp()
+
+    def _live_counters(self):
+        """Counters matching the cached file contents, or None if they'd need a rebuild."""
+        if self._counters is None or self._cached_stamp is None:
+            return None
+        return self._counters if self._counters_stamp == self._cached_stamp else None
+
+    def _get_counters(self):
+        meetings = self._read()
+        counters = self._live_counters()
+        if counters is None:
+            counters = RsvpCounters.from_meetings(iter_meetings(meetings))
+            self._counters, self._counters_stamp = counters, self._cached_stamp
+        return counters
+
+    def _commit(self, meetings, counters):
+        """Write `meetings`; keep `counters` (already updated in memory) valid."""
+        self._write(meetings)
+        if counters is not None:
+            self._counters_stamp = self._cached_stamp
+
+    def add_meetings(self, meetings, feed=None):
+        with self._lock, self._file_lock:
+            # A new list: the cached one may be held by readers.
+            existing = list(self._read())
+            counters = self._live_counters()
+            ids = []
+            for meeting in meetings:
+                meeting.setdefault("id", new_meeting_id())
+                ids.append(meeting["id"])
+                existing.append(meeting)
+                if counters is not None:
+                    for item in expand(meeting):
+                        counters.add_meeting(item)
+            self._commit(existing, counters)
+            if feed is not None:
+                feed.extend(_scheduled_events(meetings))
+        return ids
+
+    def all_meetings(self):
+        with self._lock:
+            entries = self._read()
+            if self._expanded_stamp is None or self._expanded_stamp != self._cached_stamp:
+                if any(is_series(entry) for entry in entries):
+                    self._expanded = list(iter_meetings(entries))
+                else:
+                    self._expanded = entries
+                self._expanded_stamp = self._cached_stamp
+            return list(self._expanded)
+
+    def get_meeting(self, meeting_id):
+        return _find_meeting(self._read(), meeting_id)
+
+    def latest_meeting_for(self, email):
+        for meeting in reversed(self._read()):
+            if email in meeting.get("emails", []):
+                return next(expand(meeting, reverse=True))
+        return None
+
+    def record_rsvp(self, email, response, meeting_id=None, feed=None):
+        return self._rsvps.submit((email, response, meeting_id, feed))
+
+    def _record_rsvps(self, items):
+        """Apply queued (email, response, meeting_id, feed) RSVPs in order with one write."""
+        with self._lock, self._file_lock:
+            meetings = self._read()
+            counters = self._live_counters()
+            recorded, events = [], []
+            for email, response, meeting_id, feed in items:
+                entry, date = _find_pending(meetings, email, meeting_id)
+                if entry is None:
+                    recorded.append(None)
+                    continue
+                event = _set_response(entry, date, email, response, counters)
+                recorded.append(event[1]["meeting_id"])
+                if feed is not None:
+                    events.append((feed, event))
+            if any(meeting_id is not None for meeting_id in recorded):
+                self._commit(meetings, counters)
+                _publish(events)
+            return recorded
+
+    def set_rsvp_all(self, email, response, feed=None):
+        with self._lock, self._file_lock:
+            meetings = self._read()
+            counters = self._live_counters()
+            for entry in meetings:
+                if email not in entry.get("emails", []):
+                    continue
+                if is_series(entry):
+                    for date in occurrence_dates(entry):
+                        _set_response(entry, date, email, response, counters)
+                else:
+                    _set_response(entry, None, email, response, counters)
+            self._commit(meetings, counters)
+            if feed is not None:
+                # Touches an unknown number of meetings, so readers re-snapshot instead of applying a delta.
+                feed.append("rsvp_bulk", email=email)
+
+    def summary(self):
+        with self._lock:
+            return self._get_counters().summary()
+
+    def snapshot(self, feed):
+        with self._lock, self._file_lock:
+            return feed.cursor(), self.summary()
+
+    def meeting_counts(self, meeting_id):
+        with self._lock:
+            return self._get_counters().for_meeting(meeting_id)
+
+    def query_invites(self, email=None, status=None, date_from=None, date_to=None, page=1, page_size=50):
+        start = max(0, (page - 1) * page_size)
+        rows = []
+        total = 0
+        meetings = iter_meetings(self._read(), reverse=True)
+        for row in _matching_invites(meetings, email, status, date_from, date_to):
+            if start <= total < start + page_size:
+                rows.append(row)
+            total += 1
+        return rows, total
+
+
+PARTITION_RE = re.compile(r"^(\d{4}-\d{2}|undated)\.json(\.gz)?$")
+UNDATED = "undated"
+# Manifest by_day key for meetings without a date. JSON would turn a None
+# key into "null", so the in-memory and reloaded manifests use "" instead.
+UNDATED_DAY = ""
+MANIFEST_NAME = "manifest.json"
+
+
+def partition_key(entry):
+    """
+    "YYYY-MM" of an entry's last date: a series lives in the month it ends,
+    so it stays hot while any occurrence is still upcoming.
+    """
+    if is_series(entry):
+        dates = occurrence_dates(entry)
+        date = dates[-1] if dates else None
+    else:
+        date = entry.get("date")
+    if isinstance(date, str) and len(date) >= 7 and date[4] == "-":
+        return date[:7]
+    return UNDATED
+
+
+def _current_month():
+    return datetime.date.today().strftime("%Y-%m")
+
+
+def _is_hot(key):
+    return key == UNDATED or key >= _current_month()
+
+
+def _manifest_by_day(by_day):
+    """Per-day counts with every missing-date key (None, "null", "") merged under UNDATED_DAY."""
+    merged = {}
+    for day, counts in by_day.items():
+        total = merged.setdefault(UNDATED_DAY if day in (None, "null", "") else day, {})
+        for status, n in counts.items():
+            total[status] = total.get(status, 0) + n
+    return merged
+
+
+class PartitionedJsonStore(MeetingStore):
+    """
+    The JSON log split into one file per month (see `partition_key`) plus a
+    small manifest holding each partition's file name, entry count and
+    per-day RSVP counts.
+
+    Partitions for the current month onwards are "hot": lookups, RSVPs and
+    conflict checks only read those, and `summary()` and unfiltered
+    dashboard totals come from the manifest alone. Past partitions are only
+    read for historical queries (explicit ids, older date ranges,
+    `all_meetings()`), at most `max_cold_cached` of them kept in memory.
+    `compact()` (python -m utils.meeting_store compact) rewrites past months
+    as gzip archives and imports a legacy single-file log.
+
+    `all_meetings()` is ordered by month, then insertion order within a
+    month. `set_rsvp_all` only updates hot partitions: archived meetings are
+    history and only change through an explicit meeting id. Writes are
+    locked and coalesced as in `JsonMeetingStore`.
+    """
+
+    def __init__(self, directory=DEFAULT_PARTITION_DIR, max_cold_cached=6, coalesce_window=DEFAULT_COALESCE_WINDOW):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.max_cold_cached = max_cold_cached
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(directory, ".lock"))
+        self._rsvps = WriteCoalescer(self._record_rsvps, coalesce_window, name="partitioned_rsvp")
+        self._manifest = None
+        self._manifest_stamp = None
+        self._partitions = {}
+        self._cold = OrderedDict()
+        self._all = None
+        self._all_stamp = None
+
+    def version(self):
+        # Every write rewrites the manifest, so its stamp covers all partitions.
+        return _file_stamp(self.manifest_path)
+
+    def _read_manifest(self):
+        stamp = _file_stamp(self.manifest_path)
+        if stamp is None:
+            return {"generation": 0, "partitions": {}}
+        if stamp != self._manifest_stamp:
+            manifest = _read_json_file(self.manifest_path)
+            # Manifests written before UNDATED_DAY have a "null" day.
+            for info in manifest["partitions"].values():
+                info["by_day"] = _manifest_by_day(info.get("by_day", {}))
+            self._manifest, self._manifest_stamp = manifest, stamp
+        return self._manifest
+
+    def _write_manifest(self, manifest):
+        manifest["generation"] = manifest.get("generation", 0) + 1
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json_file(self.manifest_path, manifest)
+        self._manifest, self._manifest_stamp = manifest, _file_stamp(self.manifest_path)
+
+    def _keys(self, manifest, newest_first=False):
+        keys = sorted(manifest["partitions"], key=lambda key: "" if key == UNDATED else key)
+        return keys[::-1] if newest_first else keys
+
+    def _lookup_order(self, manifest):
+        """Hot partitions first, then past months newest first."""
+        keys = self._keys(manifest)
+        return [key for key in keys if _is_hot(key)] + [key for key in reversed(keys) if not _is_hot(key)]
+
+    def _load(self, manifest, key):
+        info = manifest["partitions"].get(key)
+        if info is None:
+            return []
+        path = os.path.join(self.directory, info["file"])
+        stamp = _file_stamp(path)
+        cached = self._partitions.get(key)
+        if cached is None or cached[0] != stamp:
+            if stamp is None:
+                entries = []
+            else:
+                with LOG_SECONDS.time(backend="partitioned", op="read"):
+                    entries = _read_json_file(path)
+            cached = self._partitions[key] = (stamp, entries)
+        if not _is_hot(key):
+            self._cold[key] = None
+            self._cold.move_to_end(key)
+            while len(self._cold) > self.max_cold_cached:
+                self._partitions.pop(self._cold.popitem(last=False)[0], None)
+        return cached[1]
+
+    def _save(self, manifest, key, entries):
+        """Write one partition and refresh its manifest entry (the manifest itself is written by the caller)."""
+        info = manifest["partitions"].get(key) or {"file": f"{key}.json"}
+        path = os.path.join(self.directory, info["file"])
+        os.makedirs(self.directory, exist_ok=True)
+        with LOG_SECONDS.time(backend="partitioned", op="write"):
+            _write_json_file(path, entries)
+        manifest["partitions"][key] = {
+            "file": info["file"],
+            "entries": len(entries),
+            "by_day": _manifest_by_day(RsvpCounters.from_meetings(iter_meetings(entries)).summary()["by_day"]),
+        }
+        self._partitions[key] = (_file_stamp(path), entries)
+
+    def add_meetings(self, meetings, feed=None):
+        with self._lock, self._file_lock:
+            manifest = self._read_manifest()
+            grouped = {}
+            ids = []
+            for meeting in meetings:
+                meeting.setdefault("id", new_meeting_id())
+                ids.append(meeting["id"])
+                grouped.setdefault(partition_key(meeting), []).append(meeting)
+            for key, added in grouped.items():
+                self._save(manifest, key, self._load(manifest, key) + added)
+            self._write_manifest(manifest)
+            if feed is not None:
+                feed.extend(_scheduled_events(meetings))
+        return ids
+
+    def all_meetings(self):
+        with self._lock:
+            manifest = self._read_manifest()
+            if self._all_stamp is None or self._all_stamp != self._manifest_stamp:
+                meetings = []
+                for key in self._keys(manifest):
+                    meetings.extend(iter_meetings(self._load(manifest, key)))
+                self._all, self._all_stamp = meetings, self._manifest_stamp
+            return list(self._all)
+
+    def meetings_since(self, date):
+        with self._lock:
+            manifest = self._read_manifest()
+            meetings = []
+            for key in self._keys(manifest):
+                if key != UNDATED and key >= date[:7]:
+                    meetings.extend(m for m in iter_meetings(self._load(manifest, key)) if (m.get("date") or "") >= date)
+            return meetings
+
+    def get_meeting(self, meeting_id):
+        with self._lock:
+            manifest = self._read_manifest()
+            for key in self._lookup_order(manifest):
+                found = _find_meeting(self._load(manifest, key), meeting_id)
+                if found is not None:
+                    return found
+        return None
+
+    def latest_meeting_for(self, email):
+        with self._lock:
+            manifest = self._read_manifest()
+            for key in self._keys(manifest, newest_first=True):
+                for meeting in reversed(self._load(manifest, key)):
+                    if email in meeting.get("emails", []):
+                        return next(expand(meeting, reverse=True))
+        return None
+
+    def record_rsvp(self, email, response, meeting_id=None, feed=None):
+        return self._rsvps.submit((email, response, meeting_id, feed))
+
+    def _record_rsvps(self, items):
+        """Apply queued (email, response, meeting_id, feed) RSVPs in order; each touched partition is written once."""
+        with self._lock, self._file_lock:
+            manifest = self._read_manifest()
+            order = self._lookup_order(manifest)
+            touched = {}
+            recorded, events = [], []
+            for email, response, meeting_id, feed in items:
+                result = None
+                for key in order:
+                    entries = self._load(manifest, key)
+                    entry, date = _find_pending(entries, email, meeting_id)
+                    if entry is not None:
+                        event = _set_response(entry, date, email, response, None)
+                        result = event[1]["meeting_id"]
+                        if feed is not None:
+                            events.append((feed, event))
+                        touched[key] = entries
+                        break
+                recorded.append(result)
+            for key, entries in touched.items():
+                self._save(manifest, key, entries)
+            if touched:
+                self._write_manifest(manifest)
+                _publish(events)
+            return recorded
+
+    def set_rsvp_all(self, email, response, feed=None):
+        with self._lock, self._file_lock:
+            manifest = self._read_manifest()
+            changed = False
+            for key in self._keys(manifest):
+                if not _is_hot(key):
+                    continue
+                entries = self._load(manifest, key)
+                touched = False
+                for entry in entries:
+                    if email not in entry.get("emails", []):
+                        continue
+                    for date in occurrence_dates(entry) if is_series(entry) else (None,):
+                        _set_response(entry, date, email, response, None)
+                    touched = True
+                if touched:
+                    self._save(manifest, key, entries)
+                    changed = True
+            if changed:
+                self._write_manifest(manifest)
+            if feed is not None:
+                feed.append("rsvp_bulk", email=email)
+
+    def summary(self):
+        with self._lock:
+            manifest = self._read_manifest()
+        totals, by_day = Counter(), {}
+        for info in manifest["partitions"].values():
+            for day, counts in info.get("by_day", {}).items():
+                # Undated meetings are reported under None, as by the other backends.
+                by_day.setdefault(None if day == UNDATED_DAY else day, Counter()).update(counts)
+                totals.update(counts)
+        return summarize(totals, by_day)
+
+    def snapshot(self, feed):
+        with self._lock, self._file_lock:
+            return feed.cursor(), self.summary()
+
+    def meeting_counts(self, meeting_id):
+        meeting = self.get_meeting(meeting_id) or {}
+        return RsvpCounters.from_meetings([meeting] if meeting else []).for_meeting(meeting_id)
+
+    def query_invites(self, email=None, status=None, date_from=None, date_to=None, page=1, page_size=50):
+        start = max(0, (page - 1) * page_size)
+        with self._lock:
+            manifest = self._read_manifest()
+            total = None
+            if not email:
+                # Per-day counts in the manifest give the total without reading any partition.
+                total = 0
+                for info in manifest["partitions"].values():
+                    for day, counts in info.get("by_day", {}).items():
+                        if date_from or date_to:
+                            if day == UNDATED_DAY or (date_from and day < date_from) or (date_to and day > date_to):
+                                continue
+                        total += counts.get(status, 0) if status else sum(counts.values())
+            rows = []
+            seen = 0
+            for key in self._keys(manifest, newest_first=True):
+                if total is not None and seen >= start + page_size:
+                    break
+                # A partition only holds dates up to its month, so older ones can't match.
+                if date_from and key != UNDATED and key < date_from[:7]:
+                    continue
+                meetings = iter_meetings(self._load(manifest, key), reverse=True)
+                for row in _matching_invites(meetings, email, status, date_from, date_to):
+                    if start <= seen < start + page_size:
+                        rows.append(row)
+                    seen += 1
+                    if total is not None and seen >= start + page_size:
+                        break
+        return rows, seen if total is None else total
+
+    def compact(self, legacy_path=None):
+        """
+        Rewrite every partition in canonical form: entries regrouped by
+        `partition_key`, past months gzip-compressed, manifest rebuilt. With
+        `legacy_path`, entries of a single-file JSON log are imported too
+        (skipping ids already present). Returns {"partitions", "archived",
+        "imported"}.
+        """
+        with self._lock, self._file_lock:
+            manifest = self._read_manifest()
+            files = {}
+            if os.path.isdir(self.directory):
+                for name in sorted(os.listdir(self.directory)):
+                    match = PARTITION_RE.match(name)
+                    if match:
+                        files.setdefault(match.group(1), []).append(name)
+            grouped = {}
+            seen = set()
+            for key, names in files.items():
+                # After an interrupted archive both KEY.json and KEY.json.gz can exist; trust the manifest.
+                recorded = (manifest["partitions"].get(key) or {}).get("file")
+                name = recorded if recorded in names else names[0]
+                for entry in _read_json_file(os.path.join(self.directory, name)):
+                    if entry.get("id") not in seen:
+                        seen.add(entry.get("id"))
+                        grouped.setdefault(partition_key(entry), []).append(entry)
+
+            imported = 0
+            if legacy_path and os.path.exists(legacy_path):
+                legacy = JsonMeetingStore(legacy_path)
+                with legacy._file_lock:
+                    entries = legacy._read()
+                    if any("id" not in entry for entry in entries):
+                        # Stable ids so a second run doesn't import the same entries again.
+                        for entry in entries:
+                            entry.setdefault("id", new_meeting_id())
+                        legacy._write(entries)
+                for entry in entries:
+                    if entry["id"] not in seen:
+                        seen.add(entry["id"])
+                        grouped.setdefault(partition_key(entry), []).append(entry)
+                        imported += 1
+
+            rebuilt = {"generation": manifest.get("generation", 0), "partitions": {}}
+            archived = 0
+            for key, entries in grouped.items():
+                cold = not _is_hot(key)
+                archived += cold
+                rebuilt["partitions"][key] = {"file": f"{key}.json.gz" if cold else f"{key}.json"}
+                self._save(rebuilt, key, entries)
+            self._write_manifest(rebuilt)
+            # Only now drop files the new manifest doesn't point at.
+            wanted = {info["file"] for info in rebuilt["partitions"].values()}
+            for names in files.values():
+                for name in names:
+                    if name not in wanted:
+                        os.remove(os.path.join(self.directory, name))
+            self._partitions.clear()
+            self._cold.clear()
+            self._all_stamp = None
+        return {"partitions": len(grouped), "archived": archived, "imported": imported}
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    pk INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    date TEXT,
+    time TEXT,
+    meet_link TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS invitees (
+    meeting_pk INTEGER NOT NULL REFERENCES meetings(pk) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (meeting_pk, email)
+);
+CREATE INDEX IF NOT EXISTS idx_invitees_email ON invitees(email, meeting_pk);
+CREATE TABLE IF NOT EXISTS rsvps (
+    meeting_pk INTEGER NOT NULL REFERENCES meetings(pk) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    responded_at REAL NOT NULL,
+    PRIMARY KEY (meeting_pk, email)
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(date);
+CREATE TABLE IF NOT EXISTS rsvp_counts (
+    meeting_pk INTEGER PRIMARY KEY REFERENCES meetings(pk) ON DELETE CASCADE,
+    date TEXT,
+    accepted INTEGER NOT NULL,
+    declined INTEGER NOT NULL,
+    pending INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rsvp_counts_date ON rsvp_counts(date);
+"""
+
+
+class SqliteMeetingStore(MeetingStore):
+    """Embedded SQLite backend with meeting, invitee and RSVP tables."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Backfill counters for databases created before rsvp_counts existed.
+            self._refresh_counts(conn, "m.pk NOT IN (SELECT meeting_pk FROM rsvp_counts)")
+
+    def _refresh_counts(self, conn, where, params=()):
+        """Recount the (few) meetings matching `where` into rsvp_counts."""
+        conn.execute(
+            "INSERT OR REPLACE INTO rsvp_counts (meeting_pk, date, accepted, declined, pending) "
+            "SELECT m.pk, m.date, "
+            "COUNT(CASE WHEN r.status = 'Accepted' THEN 1 END), "
+            "COUNT(CASE WHEN r.status = 'Declined' THEN 1 END), "
+            "COUNT(CASE WHEN r.email IS NULL THEN 1 END) "
+            "FROM meetings m JOIN invitees i ON i.meeting_pk = m.pk "
+            "LEFT JOIN rsvps r ON r.meeting_pk = i.meeting_pk AND r.email = i.email "
+            f"WHERE {where} GROUP BY m.pk",
+            params,
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return _Connection(conn)
+
+    def _load(self, conn, where="", params=()):
+        with LOG_SECONDS.time(backend="sqlite", op="read"):
+            return self._load_rows(conn, where, params)
+
+    def _load_rows(self, conn, where, params):
+        rows = conn.execute(
+            f"SELECT pk, id, date, time, meet_link FROM meetings {where} ORDER BY pk", params
+        ).fetchall()
+        if not rows:
+            return []
+        subquery = f"SELECT pk FROM meetings {where}"
+        invitees = {}
+        for inv in conn.execute(
+            f"SELECT meeting_pk, email FROM invitees WHERE meeting_pk IN ({subquery}) "
+            "ORDER BY meeting_pk, position",
+            params,
+        ):
+            invitees.setdefault(inv["meeting_pk"], []).append(inv["email"])
+        responses = {}
+        for r in conn.execute(
+            f"SELECT meeting_pk, email, status, reason FROM rsvps WHERE meeting_pk IN ({subquery})", params
+        ):
+            responses[(r["meeting_pk"], r["email"])] = _decode_rsvp(r["status"], r["reason"])
+
+        meetings = []
+        for row in rows:
+            emails = invitees.get(row["pk"], [])
+            meeting = {
+                "id": row["id"],
+                "emails": emails,
+                "date": row["date"],
+                "time": row["time"],
+                "rsvp": {email: responses.get((row["pk"], email)) for email in emails},
+            }
+            if row["meet_link"]:
+                meeting["meet_link"] = row["meet_link"]
+            meetings.append(meeting)
+        return meetings
+
+    def _insert(self, conn, meeting):
+        meeting.setdefault("id", new_meeting_id())
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO meetings (id, date, time, meet_link, created_at) VALUES (?, ?, ?, ?, ?)",
+            (meeting["id"], meeting.get("date"), meeting.get("time"), meeting.get("meet_link"), time.time()),
+        )
+        if not cur.rowcount:
+            return False
+        pk = cur.lastrowid
+        emails = meeting.get("emails", [])
+        conn.executemany(
+            "INSERT OR IGNORE INTO invitees (meeting_pk, email, position) VALUES (?, ?, ?)",
+            [(pk, email, pos) for pos, email in enumerate(emails)],
+        )
+        answered = []
+        for email, value in (meeting.get("rsvp") or {}).items():
+            if value is None or email not in emails:
+                continue
+            status, reason = _encode_rsvp(value)
+            answered.append((pk, email, status, reason, time.time()))
+        conn.executemany(
+            "INSERT OR REPLACE INTO rsvps (meeting_pk, email, status, reason, responded_at) VALUES (?, ?, ?, ?, ?)",
+            answered,
+        )
+        self._refresh_counts(conn, "m.pk = ?", (pk,))
+        return True
+
+    def add_meetings(self, meetings, feed=None):
+        with LOG_SECONDS.time(backend="sqlite", op="write"), self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids, inserted = [], []
+            for meeting in meetings:
+                if is_series(meeting):
+                    meeting.setdefault("id", new_meeting_id())
+                    rows = list(expand(meeting))
+                else:
+                    rows = [meeting]
+                inserted.extend(row for row in rows if self._insert(conn, row))
+                ids.append(meeting["id"])
+            if feed is not None:
+                # Appended before COMMIT: readers that take the write lock
+                # (snapshot) see both or neither.
+                feed.extend(_scheduled_events(inserted))
+            return ids
+
+    def all_meetings(self):
+        with self._connect() as conn:
+            return self._load(conn)
+
+    def get_meeting(self, meeting_id):
+        with self._connect() as conn:
+            found = self._load(conn, "WHERE id = ?", (meeting_id,))
+        return found[0] if found else None
+
+    def meetings_since(self, date):
+        with self._connect() as conn:
+            return self._load(conn, "WHERE date >= ?", (date,))
+
+    def stored_occurrences(self, meeting_id):
+        # Series are stored as their occurrences, with ids "<series id>:<date>".
+        with self._connect() as conn:
+            return self._load(conn, "WHERE id = ? OR id LIKE ?", (meeting_id, f"{meeting_id}:%"))
+
+    def version(self):
+        with self._connect() as conn:
+            return tuple(conn.execute(
+                "SELECT (SELECT COALESCE(MAX(pk), 0) FROM meetings), "
+                "(SELECT COUNT(*) FROM rsvps), "
+                "(SELECT COALESCE(MAX(responded_at), 0) FROM rsvps)"
+            ).fetchone())
+
+    def latest_meeting_for(self, email):
+        with self._connect() as conn:
+            found = self._load(
+                conn,
+                "WHERE pk = (SELECT MAX(meeting_pk) FROM invitees WHERE email = ?)",
+                (email,),
+            )
+        return found[0] if found else None
+
+    def record_rsvp(self, email, response, meeting_id=None, feed=None):
+        status, reason = _encode_rsvp(response)
+        with LOG_SECONDS.time(backend="sqlite", op="write"), self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if meeting_id is not None:
+                row = conn.execute(
+                    "SELECT m.pk, m.id, m.date, r.status, r.reason FROM meetings m "
+                    "JOIN invitees i ON i.meeting_pk = m.pk "
+                    "LEFT JOIN rsvps r ON r.meeting_pk = m.pk AND r.email = i.email "
+                    "WHERE m.id = ? AND i.email = ?",
+                    (meeting_id, email),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT m.pk, m.id, m.date, r.status, r.reason FROM invitees i "
+                    "JOIN meetings m ON m.pk = i.meeting_pk "
+                    "LEFT JOIN rsvps r ON r.meeting_pk = i.meeting_pk AND r.email = i.email "
+                    "WHERE i.email = ? AND r.email IS NULL ORDER BY i.meeting_pk LIMIT 1",
+                    (email,),
+                ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO rsvps (meeting_pk, email, status, reason, responded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (row["pk"], email, status, reason, time.time()),
+            )
+            self._refresh_counts(conn, "m.pk = ?", (row["pk"],))
+            if feed is not None:
+                old = _decode_rsvp(row["status"], row["reason"])
+                feed.extend([_rsvp_event({"id": row["id"], "date": row["date"]}, email, old, response)])
+            return row["id"]
+
+    def set_rsvp_all(self, email, response, feed=None):
+        status, reason = _encode_rsvp(response)
+        with LOG_SECONDS.time(backend="sqlite", op="write"), self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO rsvps (meeting_pk, email, status, reason, responded_at) "
+                "SELECT meeting_pk, email, ?, ?, ? FROM invitees WHERE email = ?",
+                (status, reason, time.time(), email),
+            )
+            self._refresh_counts(conn, "m.pk IN (SELECT meeting_pk FROM invitees WHERE email = ?)", (email,))
+            if feed is not None:
+                feed.append("rsvp_bulk", email=email)
+
+    def summary(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT date, SUM(accepted), SUM(declined), SUM(pending) FROM rsvp_counts GROUP BY date"
+            ).fetchall()
+        by_day = {}
+        totals = {"Accepted": 0, "Declined": 0, "Pending": 0}
+        for date, accepted, declined, pending in rows:
+            by_day[date] = {"Accepted": accepted, "Declined": declined, "Pending": pending}
+            for status, n in by_day[date].items():
+                totals[status] += n
+        return summarize(totals, by_day)
+
+    def snapshot(self, feed):
+        # Writers append to the feed before they commit, so holding the write
+        # lock while reading keeps the cursor and the counts in step.
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return feed.cursor(), self.summary()
+
+    def meeting_counts(self, meeting_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT c.accepted, c.declined, c.pending FROM rsvp_counts c "
+                "JOIN meetings m ON m.pk = c.meeting_pk WHERE m.id = ?",
+                (meeting_id,),
+            ).fetchone()
+        accepted, declined, pending = row if row else (0, 0, 0)
+        return {"Accepted": accepted, "Declined": declined, "Pending": pending}
+
+    def query_invites(self, email=None, status=None, date_from=None, date_to=None, page=1, page_size=50):
+        clauses, params = [], []
+        if email:
+            clauses.append("i.email = ?")
+            params.append(email)
+        if date_from:
+            clauses.append("m.date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("m.date <= ?")
+            params.append(date_to)
+        if status == "Pending":
+            clauses.append("r.email IS NULL")
+        elif status:
+            clauses.append("r.status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        joins = (
+            "FROM invitees i JOIN meetings m ON m.pk = i.meeting_pk "
+            "LEFT JOIN rsvps r ON r.meeting_pk = i.meeting_pk AND r.email = i.email "
+        )
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) {joins} {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT m.id, i.email, m.date, m.time, r.status, r.reason {joins} {where} "
+                "ORDER BY m.pk DESC, i.position LIMIT ? OFFSET ?",
+                params + [page_size, max(0, (page - 1) * page_size)],
+            ).fetchall()
+        return [
+            {
+                "meeting_id": row["id"],
+                "email": row["email"],
+                "date": row["date"],
+                "time": row["time"],
+                "status": row["status"] or "Pending",
+                "reason": row["reason"] or "",
+            }
+            for row in rows
+        ], total
+
+
+class _Connection:
+    """Autocommit sqlite3 connection that commits/rolls back explicit transactions on exit."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, *args):
+        return self._conn.execute(*args)
+
+    def executemany(self, *args):
+        return self._conn.executemany(*args)
+
+    def executescript(self, script):
+        return self._conn.executescript(script)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._conn.close()
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(config=None):
+    """
+    Return the store selected by `storage_backend` in config.json
+    ("json" by default, "sqlite" or "partitioned"). Instances are shared per path.
+    """
+    config = config or {}
+    backend = config.get("storage_backend", "json")
+    if backend == "sqlite":
+        key = (backend, config.get("sqlite_path", DEFAULT_SQLITE_PATH))
+        factory = SqliteMeetingStore
+    elif backend == "json":
+        key = (backend, config.get("meeting_log_path", DEFAULT_JSON_PATH))
+        factory = JsonMeetingStore
+    elif backend == "partitioned":
+        key = (backend, config.get("meeting_log_dir", DEFAULT_PARTITION_DIR))
+        factory = PartitionedJsonStore
+    else:
+        raise ValueError(f"Unknown storage_backend: {backend!r}")
+    with _STORES_LOCK:
+        if key not in _STORES:
+            if backend == "sqlite":
+                _STORES[key] = factory(key[1])
+            else:
+                window = float(config.get("rsvp_coalesce_ms", DEFAULT_COALESCE_WINDOW * 1000)) / 1000
+                _STORES[key] = factory(key[1], coalesce_window=window)
+        return _STORES[key]
+
+
+def migrate_json_to_sqlite(json_path=DEFAULT_JSON_PATH, sqlite_path=DEFAULT_SQLITE_PATH):
+    """
+    Copy every meeting from the JSON log into SQLite. Safe to re-run:
+    meetings already present (by id) are skipped. Returns the number of
+    meetings read from the JSON file.
+    """
+    source = JsonMeetingStore(json_path)
+    # Raw entries, not all_meetings(): series are written back unexpanded.
+    with source._file_lock:
+        meetings = source._read()
+        if any("id" not in meeting for meeting in meetings):
+            # Give legacy entries stable ids so a re-run doesn't duplicate them.
+            for meeting in meetings:
+                meeting.setdefault("id", new_meeting_id())
+            source._write(meetings)
+    SqliteMeetingStore(sqlite_path).add_meetings(meetings)
+    return len(meetings)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "migrate":
+        count = migrate_json_to_sqlite(*sys.argv[2:4])
+        print(f"Migrated {count} meetings.")
+    elif command == "compact":
+        legacy_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_JSON_PATH
+        directory = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_PARTITION_DIR
+        stats = PartitionedJsonStore(directory).compact(legacy_path)
+        print(
+            f"Compacted {stats['partitions']} partitions ({stats['archived']} archived), "
+            f"imported {stats['imported']} meetings."
+        )
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,203 @@
+"""
+In-process counters and histograms, exported in the Prometheus text format.
+
+    SMTP_SECONDS = histogram("smtp_seconds", "SMTP phase latency", ["phase"])
+    with SMTP_SECONDS.time(phase="login"):
+        ...
+    ERRORS = counter("smtp_errors_total", "SMTP failures", ["phase"])
+    ERRORS.inc(phase="send")
+
+Metrics live per process: the RSVP server's /metrics shows its own
+requests, follow-ups and store access; the Streamlit process keeps its own
+(the sidebar shows them). `profile_sampled` wraps request handlers to
+cProfile a sample of calls and keep the profiles of slow ones.
+"""
+
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(zip(self.labelnames, key))} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count.
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def stats(self):
+        """{label tuple: (count, mean seconds)} for quick display."""
+        with self._lock:
+            return {key: (state[2], state[1] / state[2]) for key, state in self._values.items() if state[2]}
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                pairs = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(pairs)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return lines
+
+
+def _register(cls, name, *args, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"metric {name} already registered as a {metric.kind}")
+        return metric
+
+
+def counter(name, help_text, labelnames=()):
+    """Get or create the process-wide Counter called `name`."""
+    return _register(Counter, name, help_text, labelnames)
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Get or create the process-wide Histogram called `name`."""
+    return _register(Histogram, name, help_text, labelnames, buckets)
+
+
+def histograms():
+    with _registry_lock:
+        return [metric for metric in _registry.values() if isinstance(metric, Histogram)]
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+PROFILED = counter("profiled_requests_total", "Requests run under the sampling profiler", ["name", "kept"])
+# Only one cProfile profiler may be active per process (Python 3.12+ raises
+# ValueError otherwise), so overlapping sampled calls run unprofiled.
+_profiler_lock = threading.Lock()
+
+
+def profile_sampled(name, get_settings):
+    """
+    Decorator: run a `sample_rate` fraction of calls under cProfile and save
+    the stats of those slower than `threshold_ms` to `directory`.
+    `get_settings()` returns (sample_rate, threshold_ms, directory) and is
+    read on every call, so profiling can be switched on without a restart.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            sample_rate, threshold_ms, directory = get_settings()
+            if not sample_rate or random.random() >= sample_rate:
+                return fn(*args, **kwargs)
+            if not _profiler_lock.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                try:
+                    return profiler.runcall(fn, *args, **kwargs)
+                finally:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    kept = elapsed_ms >= threshold_ms
+                    PROFILED.inc(name=name, kept=str(kept).lower())
+                    if kept:
+                        os.makedirs(directory, exist_ok=True)
+                        path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed_ms)}ms.prof")
+                        profiler.dump_stats(path)
+                        print(f"[profile] {name} took {elapsed_ms:.0f} ms; stats saved to {path}")
+            finally:
+                _profiler_lock.release()
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,262 @@
+"""
+Durable outbox for outgoing mail.
+
+Messages are written to SQLite (one row each) before any SMTP traffic, so a
+crash mid-send never loses an invite. Workers claim rows atomically, failed
+sends are retried with exponential backoff plus jitter, and rows left in
+"sending" by a dead process are reclaimed after `claim_timeout` seconds.
+Each message carries an idempotency key; enqueueing the same key twice is a
+no-op.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+DEFAULT_OUTBOX_PATH = "logs/outbox.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachments TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+"""
+
+
+class Outbox:
+    def __init__(
+        self,
+        path=DEFAULT_OUTBOX_PATH,
+        max_attempts=8,
+        base_delay=30.0,
+        max_delay=3600.0,
+        claim_timeout=300.0,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.claim_timeout = claim_timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "attachments" not in columns:
+                conn.execute("ALTER TABLE outbox ADD COLUMN attachments TEXT")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, recipient, subject, body, idempotency_key, attachments=None):
+        """
+        Queue a message, with optional text (filename, content_type, content)
+        attachments. Returns its row id (existing id if the key was already queued).
+        """
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(idempotency_key, recipient, subject, body, attachments, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    idempotency_key, recipient, subject, body,
+                    json.dumps(attachments) if attachments else None, now, now,
+                ),
+            )
+            row = conn.execute(
+                "SELECT id FROM outbox WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+            return row["id"]
+        finally:
+            conn.close()
+
+    def claim(self, ids=None, limit=100):
+        """
+        Atomically move due messages to "sending" and return them as dicts.
+        With `ids`, only those rows are considered.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Crash recovery: a claim that never finished goes back to the queue.
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_at = NULL "
+                "WHERE status = 'sending' AND claimed_at < ?",
+                (now - self.claim_timeout,),
+            )
+            query = "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?"
+            params = [now]
+            if ids is not None:
+                ids = list(ids)
+                if not ids:
+                    conn.execute("COMMIT")
+                    return []
+                query += f" AND id IN ({','.join('?' * len(ids))})"
+                params.extend(ids)
+            query += " ORDER BY next_attempt_at, id LIMIT ?"
+            params.append(limit)
+            rows = [dict(row) for row in conn.execute(query, params)]
+            for row in rows:
+                if row["attachments"]:
+                    row["attachments"] = [tuple(a) for a in json.loads(row["attachments"])]
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                [(now, row["id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+            return rows
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def mark_sent(self, message_id):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, "
+                "last_error = NULL WHERE id = ?",
+                (time.time(), message_id),
+            )
+        finally:
+            conn.close()
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        # "Equal jitter": keep half the delay, randomise the rest.
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def mark_failed(self, message_id, error):
+        """Schedule a retry, or give up ("dead") after `max_attempts`."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT attempts FROM outbox WHERE id = ?", (message_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return
+            attempts = row["attempts"] + 1
+            status = "dead" if attempts >= self.max_attempts else "pending"
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, "
+                "claimed_at = NULL, last_error = ? WHERE id = ?",
+                (status, attempts, time.time() + self._backoff(attempts), str(error), message_id),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def deliver(self, send, ids=None, limit=100):
+        """
+        Claim due messages and send them one by one with `send(recipient,
+        subject, body[, attachments])`. Returns a list of {"email", "error"}
+        failures.
+        """
+        failures = []
+        for message in self.claim(ids=ids, limit=limit):
+            try:
+                send_message(send, message)
+            except Exception as e:
+                self.mark_failed(message["id"], e)
+                failures.append({"email": message["recipient"], "error": str(e)})
+            else:
+                self.mark_sent(message["id"])
+        return failures
+
+    def counts(self):
+        conn = self._connect()
+        try:
+            return {
+                row["status"]: row["n"]
+                for row in conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status")
+            }
+        finally:
+            conn.close()
+
+
+def send_message(send, message):
+    """Call `send` for a claimed row, passing attachments only when it has some."""
+    if message.get("attachments"):
+        send(message["recipient"], message["subject"], message["body"], message["attachments"])
+    else:
+        send(message["recipient"], message["subject"], message["body"])
+
+
+_OUTBOXES = {}
+_OUTBOXES_LOCK = threading.Lock()
+
+
+def get_outbox(config):
+    """Shared `Outbox` for the `outbox_*` settings in config.json."""
+    path = config.get("outbox_path", DEFAULT_OUTBOX_PATH)
+    with _OUTBOXES_LOCK:
+        if path not in _OUTBOXES:
+            _OUTBOXES[path] = Outbox(
+                path,
+                max_attempts=int(config.get("outbox_max_attempts", 8)),
+                base_delay=float(config.get("outbox_retry_base_seconds", 30)),
+            )
+        return _OUTBOXES[path]
+
+
+class OutboxWorker:
+    """
+    Background loop that delivers due outbox messages every `interval`
+    seconds, or sooner when `wake()` is called.
+    """
+
+    def __init__(self, outbox, send, interval=15.0):
+        self.outbox = outbox
+        self.send = send
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.outbox.deliver(self.send)
+            except Exception as e:
+                print(f"[outbox] delivery pass failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stop(self, timeout=30):
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout)
@@ -0,0 +1,35 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `burst`. `acquire()` blocks until
+    a token is available. A rate of 0/None disables limiting.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate or 0)
+        self.burst = max(1.0, float(burst or self.rate or 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
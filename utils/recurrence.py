@@ -0,0 +1,113 @@
+"""
+Recurring meetings stored as one series record instead of one log entry
+per day:
+
+    {"id": "...", "series": {"dtstart": "YYYY-MM-DD", "rrule": "FREQ=DAILY;COUNT=30"},
+     "emails": [...], "time": "HH:MM",
+     "rsvp": {"YYYY-MM-DD": {email: <rsvp value>}}}
+
+`rsvp` only holds occurrences somebody has answered. Occurrences are
+expanded on demand into the flat meeting shape, with ids of the form
+"<series id>:<YYYY-MM-DD>". Supported rule parts: FREQ (DAILY, WEEKLY),
+INTERVAL, COUNT and UNTIL.
+"""
+
+import datetime
+from functools import lru_cache
+
+_STEP_DAYS = {"DAILY": 1, "WEEKLY": 7}
+
+
+def make_series(series_id, start_date, count, emails, time, freq="DAILY", interval=1):
+    rrule = f"FREQ={freq};COUNT={int(count)}"
+    if interval != 1:
+        rrule += f";INTERVAL={int(interval)}"
+    return {
+        "id": series_id,
+        "series": {"dtstart": start_date, "rrule": rrule},
+        "emails": emails,
+        "time": time,
+        "rsvp": {},
+    }
+
+
+def is_series(entry):
+    return "series" in entry
+
+
+def occurrence_id(series_id, date):
+    return f"{series_id}:{date}"
+
+
+def split_occurrence_id(meeting_id):
+    """(series id, date) for an occurrence id, else None."""
+    if not meeting_id or ":" not in meeting_id:
+        return None
+    series_id, _, date = meeting_id.rpartition(":")
+    return series_id, date
+
+
+@lru_cache(maxsize=256)
+def _parse_rule(dtstart, rrule):
+    parts = dict(part.split("=", 1) for part in rrule.upper().split(";") if "=" in part)
+    freq = parts.get("FREQ", "DAILY")
+    if freq not in _STEP_DAYS:
+        raise ValueError(f"Unsupported recurrence frequency: {freq}")
+    step = _STEP_DAYS[freq] * int(parts.get("INTERVAL", 1))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    until = None
+    if "UNTIL" in parts:
+        until = datetime.datetime.strptime(parts["UNTIL"][:8].replace("-", ""), "%Y%m%d").date()
+    if count is None and until is None:
+        raise ValueError("Recurrence rule needs COUNT or UNTIL")
+    start = datetime.date.fromisoformat(dtstart)
+    dates = []
+    day = start
+    while (count is None or len(dates) < count) and (until is None or day <= until):
+        dates.append(day.isoformat())
+        day += datetime.timedelta(days=step)
+    return tuple(dates)
+
+
+def occurrence_dates(entry):
+    """Every occurrence date of a series, oldest first."""
+    rule = entry["series"]
+    return _parse_rule(rule["dtstart"], rule["rrule"])
+
+
+def _occurrence(entry, date):
+    answered = (entry.get("rsvp") or {}).get(date) or {}
+    meeting = {
+        "id": occurrence_id(entry["id"], date),
+        "series_id": entry["id"],
+        "emails": entry.get("emails", []),
+        "date": date,
+        "time": entry.get("time"),
+        "rsvp": {email: answered.get(email) for email in entry.get("emails", [])},
+    }
+    if entry.get("meet_link"):
+        meeting["meet_link"] = entry["meet_link"]
+    return meeting
+
+
+def occurrence(entry, date):
+    """The flat meeting dict for one date of a series, or None if it isn't an occurrence."""
+    if date not in occurrence_dates(entry):
+        return None
+    return _occurrence(entry, date)
+
+
+def expand(entry, reverse=False):
+    """Yield a series' occurrences (or a flat entry as-is)."""
+    if not is_series(entry):
+        yield entry
+        return
+    dates = occurrence_dates(entry)
+    for date in reversed(dates) if reverse else dates:
+        yield _occurrence(entry, date)
+
+
+def iter_meetings(entries, reverse=False):
+    """Flat meetings for a mix of series and legacy entries, in log order."""
+    for entry in reversed(entries) if reverse else entries:
+        yield from expand(entry, reverse)
@@ -0,0 +1,91 @@
+"""
+Aggregate RSVP counters (accepted / declined / pending) per meeting, per day
+and overall, kept up to date as meetings are added and responses arrive so
+the dashboard never has to count the whole history.
+"""
+
+from collections import Counter
+
+STATUSES = ("Accepted", "Declined", "Pending")
+
+
+def status_of(value):
+    """Collapse a stored RSVP value to one of STATUSES."""
+    if value is None:
+        return "Pending"
+    if isinstance(value, dict):
+        return value.get("status", "Declined")
+    return value
+
+
+class RsvpCounters:
+    def __init__(self):
+        self.by_meeting = {}
+        self.by_day = {}
+        self.totals = Counter()
+
+    @classmethod
+    def from_meetings(cls, meetings):
+        counters = cls()
+        for meeting in meetings:
+            counters.add_meeting(meeting)
+        return counters
+
+    def _bump(self, meeting_id, date, status, delta):
+        self.by_meeting.setdefault(meeting_id, Counter())[status] += delta
+        self.by_day.setdefault(date, Counter())[status] += delta
+        self.totals[status] += delta
+
+    def add_meeting(self, meeting):
+        rsvp = meeting.get("rsvp") or {}
+        for email in meeting.get("emails", []):
+            self._bump(meeting.get("id"), meeting.get("date"), status_of(rsvp.get(email)), 1)
+
+    def change(self, meeting, old_value, new_value):
+        """Record one invitee's response moving from `old_value` to `new_value`."""
+        old_status, new_status = status_of(old_value), status_of(new_value)
+        if old_status == new_status:
+            return
+        self._bump(meeting.get("id"), meeting.get("date"), old_status, -1)
+        self._bump(meeting.get("id"), meeting.get("date"), new_status, 1)
+
+    def summary(self):
+        return summarize(self.totals, self.by_day)
+
+    def for_meeting(self, meeting_id):
+        return _as_dict(self.by_meeting.get(meeting_id, Counter()))
+
+
+def _as_dict(counts):
+    return {status: int(counts.get(status, 0)) for status in STATUSES}
+
+
+def summarize(totals, by_day):
+    """Shape shared by every backend's `summary()`."""
+    return {
+        "totals": _as_dict(totals),
+        "by_day": {day: _as_dict(counts) for day, counts in sorted(by_day.items(), key=lambda item: str(item[0]))},
+    }
+
+
+def apply_change(summary, event):
+    """
+    Fold one change-feed event into a `summary()`-shaped dict in place.
+    Returns False for events that can't be applied as a delta; the caller
+    should take a fresh snapshot instead.
+    """
+    kind = event.get("kind")
+    if kind == "scheduled":
+        deltas = [("Pending", len(event.get("emails", [])))]
+    elif kind == "rsvp":
+        old, new = event.get("old"), event.get("new")
+        if old not in STATUSES or new not in STATUSES:
+            return False
+        deltas = [(old, -1), (new, 1)] if old != new else []
+    else:
+        return False
+    day = summary["by_day"].setdefault(event.get("date"), _as_dict({}))
+    for status, delta in deltas:
+        summary["totals"][status] += delta
+        day[status] += delta
+    return True
@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+
+from utils.config import PLACEHOLDER_SECRETS, ConfigError
+
+# 96-bit truncated HMAC-SHA256 keeps links short while staying unforgeable.
+_SIGNATURE_BYTES = 12
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload, secret):
+    return hmac.new(secret.encode(), payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def make_token(meeting_id, email, secret):
+    """Encode a (meeting id, invitee) pair into a compact signed URL token."""
+    payload = f"{meeting_id}\n{email}".encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload, secret))}"
+
+
+def parse_token(token, secret):
+    """Return (meeting_id, email) for a valid token, or None if it was tampered with."""
+    try:
+        encoded_payload, encoded_sig = token.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_sig)
+    except (ValueError, TypeError):
+        return None
+    if not hmac.compare_digest(signature, _sign(payload, secret)):
+        return None
+    meeting_id, _, email = payload.decode(errors="replace").partition("\n")
+    if not meeting_id or not email:
+        return None
+    return meeting_id, email
+
+
+DEFAULT_SECRET_PATH = "logs/rsvp_secret"
+_generated = {}
+_generated_lock = threading.Lock()
+
+
+def _stored_secret(path):
+    """Read the generated secret at `path`, creating it on first use (safe across processes)."""
+    with _generated_lock:
+        if path not in _generated:
+            if not os.path.exists(path):
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(secrets.token_urlsafe(32))
+                    f.flush()
+                    os.fsync(f.fileno())
+                try:
+                    # link() fails if another process got there first; its secret wins.
+                    os.link(tmp, path)
+                    print(f"Generated an RSVP signing secret in {path}; keep it with the meeting data.")
+                except FileExistsError:
+                    pass
+                finally:
+                    os.remove(tmp)
+            with open(path) as f:
+                _generated[path] = f.read().strip()
+        return _generated[path]
+
+
+def token_secret(config):
+    """
+    `rsvp_secret` from config.json, or else a random secret generated once
+    and kept at `rsvp_secret_path`. The example placeholder is refused.
+    """
+    secret = config.get("rsvp_secret")
+    if secret in PLACEHOLDER_SECRETS:
+        raise ConfigError("Invalid config: 'rsvp_secret' is the example placeholder; set a long random string")
+    if secret:
+        return secret
+    secret = _stored_secret(config.get("rsvp_secret_path", DEFAULT_SECRET_PATH))
+    if not secret:
+        raise ConfigError("Invalid config: generated RSVP secret file is empty; delete it or set 'rsvp_secret'")
+    return secret
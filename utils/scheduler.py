@@ -1,24 +1,20 @@
+import atexit
 import datetime
-import json
-import os
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import dateparser
-
-from utils.email_sender import send_email
+from utils.change_feed import get_change_feed
+from utils.config import get_config
+from utils.email_sender import pool_from_config
 from utils.contact_map import resolve_emails_from_names
-
-# Load config
-with open("config.json") as f:
-    config = json.load(f)
-
-SENDER_EMAIL = config["sender_email"]
-SENDER_PASSWORD = config["sender_password"]
-SMTP_SERVER = config.get("smtp_server", "smtp.gmail.com")
-SMTP_PORT = int(config.get("smtp_port", 465))
-LOG_FILE = "logs/meeting_logs.json"
-FLASK_PORT = int(config.get("flask_port", 5001))
-RSVP_BASE_URL = config.get("rsvp_base_url")
+from utils.meeting_store import get_store, new_meeting_id
+from utils.interval_index import IntervalIndex, get_index, index_added, meeting_start
+from utils.invites import ICS_CONTENT_TYPE, ICS_FILENAME, build_ics, render_digest, render_invite
+from utils.outbox import get_outbox, send_message
+from utils.rate_limiter import TokenBucket
+from utils.recurrence import expand, make_series
+from utils.rsvp_tokens import make_token, token_secret
 
 
 def _get_local_ip():
@@ -32,13 +28,152 @@ def _get_local_ip():
 
 
 def _build_base_url():
-    if RSVP_BASE_URL:
-        return RSVP_BASE_URL.rstrip("/")
-    return f"http://{_get_local_ip()}:{FLASK_PORT}"
+    config = get_config()
+    if config.get("rsvp_base_url"):
+        return config["rsvp_base_url"].rstrip("/")
+    return f"http://{_get_local_ip()}:{int(config.get('flask_port', 5001))}"
+
+
+class SchedulingConflict(RuntimeError):
+    """Invitees are already booked; `conflicts` lists (email, date, meeting_id)."""
+
+    def __init__(self, conflicts, suggestions):
+        self.conflicts = conflicts
+        self.suggestions = suggestions
+        busy = ", ".join(f"{email} on {date}" for email, date, _ in conflicts)
+        message = f"Invitees already have a meeting at that time: {busy}"
+        if suggestions:
+            message += ". Free slots: " + ", ".join(start.strftime("%Y-%m-%d %H:%M") for start, _ in suggestions)
+        super().__init__(message)
+
+
+class DeliveryError(RuntimeError):
+    """
+    Meetings were stored but some invites failed. They stay in the outbox,
+    which only the RSVP server (app.py) retries while it is running.
+    """
+
+    def __init__(self, failures, meeting_ids):
+        self.failures = failures
+        self.meeting_ids = meeting_ids
+        details = ", ".join([f"{f['email']} ({f['error']})" for f in failures])
+        super().__init__(f"Failed to send to: {details} (queued in the outbox; the RSVP server retries them while it is running)")
+
+
+def _check_conflicts(store, plans, config):
+    """
+    Raise SchedulingConflict if any invitee is busy during one of the
+    planned occurrences, either in the store or in an earlier meeting of
+    the same request.
+    """
+    duration = int(config.get("meeting_duration_minutes", 30))
+    index = get_index(store, duration)
+    # Meetings requested together must not collide with each other either.
+    pending = IntervalIndex(duration)
+    length = datetime.timedelta(minutes=duration)
+    conflicts = []
+    first_busy = None
+    for plan in plans:
+        emails = plan["emails"]
+        first_start = None
+        found = []
+        for meeting in plan["occurrences"]:
+            start = meeting_start(meeting)
+            if start is None:
+                continue
+            first_start = first_start or start
+            found.extend(
+                (email, meeting["date"], meeting_id)
+                for source in (index, pending)
+                for email, meeting_id in source.conflicts(emails, start, start + length)
+            )
+        if found and first_busy is None:
+            first_busy = (emails, first_start)
+        conflicts.extend(found)
+        for meeting in plan["occurrences"]:
+            pending.add_meeting(meeting)
+    if conflicts:
+        emails, first_start = first_busy
+        hours = tuple(config.get("working_hours", (9, 17)))
+        window = (first_start, first_start + datetime.timedelta(days=7))
+        candidates = index.find_free_slots(emails, window, duration, limit=10, hours=hours)
+        suggestions = [slot for slot in candidates if not pending.conflicts(emails, *slot)][:3]
+        raise SchedulingConflict(conflicts, suggestions)
+
 
-def schedule_meetings(recipients, date, time, days):
-    logs = []
+_MAILER = {"key": None, "pool": None, "limiter": None}
+_MAILER_LOCK = threading.Lock()
 
+
+def _shared_mailer(config, workers):
+    """
+    The process-wide (SMTPPool, TokenBucket) for the current SMTP settings,
+    so the rate limit and authenticated sessions carry over between
+    scheduling calls. Rebuilt when the settings change; pools are closed
+    at exit.
+    """
+    key = (
+        config.get("sender_email"),
+        config.get("sender_password"),
+        config.get("smtp_server", "smtp.gmail.com"),
+        int(config.get("smtp_port", 465)),
+        config.get("smtp_messages_per_connection"),
+        workers,
+        float(config.get("smtp_rate_per_sec", 10)),
+        int(config.get("smtp_burst", 10)),
+    )
+    with _MAILER_LOCK:
+        if _MAILER["key"] != key:
+            if _MAILER["pool"] is not None:
+                # Sessions still checked out are returned idle and closed at exit.
+                _MAILER["pool"].close()
+            pool = pool_from_config(config, size=workers)
+            atexit.register(pool.close)
+            _MAILER.update(key=key, pool=pool, limiter=TokenBucket(key[6], key[7]))
+        return _MAILER["pool"], _MAILER["limiter"]
+
+
+def _dispatch(messages):
+    """
+    Send claimed outbox rows over the shared SMTP pool using `smtp_workers`
+    threads, throttled by the shared token bucket, and record each outcome
+    in the outbox. Returns a list of {"email", "error"} dicts for messages
+    that could not be sent (they stay in the outbox for the RSVP server to retry).
+    """
+    config = get_config()
+    # Concurrent dispatch: 1 worker keeps the old one-at-a-time behaviour.
+    workers = max(1, int(config.get("smtp_workers", 4)))
+    pool, limiter = _shared_mailer(config, workers)
+    outbox = get_outbox(config)
+
+    def send_one(message):
+        recipient = message["recipient"]
+        limiter.acquire()
+        try:
+            send_message(pool.send, message)
+        except Exception as e:
+            print(f"Failed to send email to {recipient}: {e}")
+            outbox.mark_failed(message["id"], e)
+            return {"email": recipient, "error": str(e)}
+        outbox.mark_sent(message["id"])
+        return None
+
+    if workers == 1:
+        results = [send_one(item) for item in messages]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as executor:
+            results = list(executor.map(send_one, messages))
+
+    return [r for r in results if r]
+
+
+def _plan_meeting(recipients, date, time, days, meeting_id=None):
+    """
+    Resolve recipients and the date for one request and lay out what to
+    store: {"emails", "time", "logs", "occurrences"}, or None when the
+    request can't be scheduled (no resolvable recipients or a bad date).
+    `meeting_id` (default: a fresh one) names the meeting or series.
+    """
     # Accept either direct emails or contact names
     emails = []
     unresolved = []
@@ -57,105 +192,165 @@ def schedule_meetings(recipients, date, time, days):
 
     if not emails:
         print("No valid recipients. Provide email addresses or known contact names.")
-        return
+        return None
 
     if unresolved:
         print(f"Warning: no email mapping for {', '.join(unresolved)}")
 
-    # Parse the date (supports relative like 'tomorrow', 'next Monday')
-    parsed_date = dateparser.parse(date)
+    # Parse the date (supports relative like 'tomorrow', 'next Monday').
+    # Imported here: dateparser is slow to load and only needed on this path.
+    import dateparser
+
+    parsed_date = dateparser.parse(date) if date else None
     if not parsed_date:
         print("❌ Error parsing date:", date)
-        return
-
-    failures = []
+        return None
 
-    base_url = _build_base_url()
-
-    for i in range(days):
-        scheduled_date = (
-            parsed_date + datetime.timedelta(days=i)
-        ).strftime("%Y-%m-%d")
-
-        for email in emails:
-            accept_link = f"{base_url}/rsvp/accept/{email}"
-            decline_link = f"{base_url}/rsvp/decline/{email}"
-
-            message = f"""\
-Hi {email},
-
-You're invited to a meeting on {scheduled_date} at {time}.
-
-Please RSVP below:
-✅ Accept: {accept_link}
-❌ Decline: {decline_link}
-
-Best,
-AI Scheduler Bot
-"""
-
-            try:
-                send_email(
-                    email,
-                    "Meeting Invite with RSVP",
-                    message,
-                    SENDER_EMAIL,
-                    SENDER_PASSWORD,
-                    SMTP_SERVER,
-                    SMTP_PORT,
-                )
-            except Exception as e:
-                failures.append({"email": email, "error": str(e)})
-                print(f"Failed to send email to {email}: {e}")
-
-        logs.append({
+    start_date = parsed_date.strftime("%Y-%m-%d")
+    if days > 1:
+        # One series record rather than `days` copies of the invitee list.
+        series = make_series(meeting_id or new_meeting_id(), start_date, days, emails, time)
+        logs = [series]
+        occurrences = list(expand(series))
+    else:
+        occurrences = [{
+            "id": meeting_id or new_meeting_id(),
             "emails": emails,
-            "date": scheduled_date,
+            "date": start_date,
             "time": time,
             "rsvp": {email: None for email in emails}
-        })
-
-    # Save logs
-    os.makedirs("logs", exist_ok=True)
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "r+") as f:
-            try:
-                existing = json.load(f)
-            except json.JSONDecodeError:
-                existing = []
-            existing.extend(logs)
-            f.seek(0)
-            json.dump(existing, f, indent=4)
-            f.truncate()
-    else:
-        with open(LOG_FILE, "w") as f:
-            json.dump(logs, f, indent=4)
+        }]
+        logs = occurrences
+    return {"emails": emails, "time": time, "logs": logs, "occurrences": occurrences}
+
+
+def _render_invites(plan, digest, config, base_url, secret):
+    """Outbox entries (recipient, subject, body, key[, attachments]) for one planned request."""
+    outgoing = []
+    time = plan["time"]
+    occurrences = plan["occurrences"]
+    duration = int(config.get("meeting_duration_minutes", 30))
+    for email in plan["emails"]:
+        sessions = []
+        for meeting in occurrences:
+            token = make_token(meeting["id"], email, secret)
+            sessions.append((meeting, f"{base_url}/rsvp/accept/{token}", f"{base_url}/rsvp/decline/{token}"))
+
+        if digest and len(sessions) > 1:
+            subject, message = render_digest(
+                email, time, [(meeting["date"], accept, decline) for meeting, accept, decline in sessions]
+            )
+            ics = build_ics(
+                occurrences,
+                duration_minutes=duration,
+                organizer=config.get("sender_email"),
+                links={meeting["id"]: accept for meeting, accept, _ in sessions},
+            )
+            outgoing.append((
+                email, subject, message, f"digest:{plan['logs'][0]['id']}:{email}",
+                [(ICS_FILENAME, ICS_CONTENT_TYPE, ics)],
+            ))
+            continue
+
+        for meeting, accept_link, decline_link in sessions:
+            subject, message = render_invite(email, meeting["date"], time, accept_link, decline_link)
+            outgoing.append((email, subject, message, f"invite:{meeting['id']}:{email}"))
+    return outgoing
+
+
+def schedule_many(meetings, digest=None, allow_conflicts=None, ids=None):
+    """
+    Schedule several {emails, date, time, days} requests (e.g. every
+    meeting extracted from one prompt) in one pass: one conflict check, one
+    store write, one change-feed append and one SMTP dispatch for all of
+    them. With `digest` (default: the `invite_digest` setting) a multi-day
+    request sends each recipient one message covering every occurrence.
+
+    Raises SchedulingConflict, with suggested free slots, when an invitee
+    is already booked (in the store or by another request in the batch)
+    unless `allow_conflicts` (default: the `allow_conflicts` setting) is
+    set; nothing is stored in that case.
+
+    `ids` gives each request a fixed meeting (or series) id, which makes
+    re-running the same requests safe: one whose meeting is already stored
+    is not stored or conflict-checked again, and its invites are re-queued
+    under the same outbox keys, so only those never sent go out.
+
+    Returns one entry per request: its stored meeting ids (one per
+    occurrence), or None when that request was rejected (no resolvable
+    recipients or an unparseable date).
+    """
+    ids = ids or [None] * len(meetings)
+    plans = [
+        _plan_meeting(
+            spec.get("emails") or [], spec.get("date"), spec.get("time"), int(spec.get("days") or 1), meeting_id
+        )
+        for spec, meeting_id in zip(meetings, ids)
+    ]
+    accepted = [plan for plan in plans if plan is not None]
+    if not accepted:
+        return [None] * len(plans)
+
+    config = get_config()
+    store = get_store(config)
+    new = []
+    for position, (plan, meeting_id) in enumerate(zip(plans, ids)):
+        if plan is None:
+            continue
+        stored = store.stored_occurrences(meeting_id) if meeting_id is not None else []
+        if not stored:
+            new.append(plan)
+            continue
+        # Already stored by an earlier, interrupted run with the same id. A
+        # relative date may have resolved differently this time, so invites
+        # are rebuilt from what was stored and keep their outbox keys.
+        plans[position] = dict(plan, occurrences=stored, time=stored[0].get("time"), emails=stored[0].get("emails"))
+    accepted = [plan for plan in plans if plan is not None]
+    if allow_conflicts is None:
+        allow_conflicts = bool(config.get("allow_conflicts", False))
+    if not allow_conflicts and new:
+        _check_conflicts(store, new, config)
+
+    if digest is None:
+        digest = bool(config.get("invite_digest", True))
+    base_url = _build_base_url()
+    secret = token_secret(config)
+    outgoing = []
+    for plan in accepted:
+        outgoing.extend(_render_invites(plan, digest, config, base_url, secret))
+
+    # Save logs, then queue every invite durably before touching SMTP so a
+    # crash mid-send leaves the rest in the outbox for the RSVP server to resume.
+    occurrences = [meeting for plan in new for meeting in plan["occurrences"]]
+    if new:
+        store.add_meetings([log for plan in new for log in plan["logs"]], feed=get_change_feed(config))
+        index_added(store, occurrences)
+    outbox = get_outbox(config)
+    message_ids = [outbox.enqueue(*item) for item in outgoing]
+    failures = _dispatch(outbox.claim(ids=message_ids, limit=len(message_ids)))
 
     # If any failures, raise to surface in UI
     if failures:
-        details = ", ".join([f"{f['email']} ({f['error']})" for f in failures])
-        raise RuntimeError(f"Failed to send to: {details}")
+        raise DeliveryError(failures, [meeting["id"] for plan in accepted for meeting in plan["occurrences"]])
+    return [None if plan is None else [meeting["id"] for meeting in plan["occurrences"]] for plan in plans]
+
+
+def schedule_meetings(recipients, date, time, days, digest=None, allow_conflicts=None):
+    """
+    Store one meeting request and email RSVP invites; see `schedule_many`.
+
+    Returns the stored meeting ids (one per occurrence), or None when the
+    request was rejected (no resolvable recipients or an unparseable date).
+    """
+    request = {"emails": recipients, "date": date, "time": time, "days": days}
+    return schedule_many([request], digest=digest, allow_conflicts=allow_conflicts)[0]
 
 
 def update_rsvp_status(email, response, reason=None):
     """ Update RSVP status in logs; store reason for declines. """
-    if not os.path.exists(LOG_FILE):
-        print("No meeting logs found to update.")
-        return
-
-    with open(LOG_FILE, "r") as f:
-        try:
-            meeting_logs = json.load(f)
-        except json.JSONDecodeError:
-            print("❌ Could not parse meeting log file.")
-            return
-
-    for log in meeting_logs:
-        if email in log.get("emails", []):
-            if response == "accept":
-                log["rsvp"][email] = "Accepted"
-            elif response == "decline":
-                log["rsvp"][email] = {"status": "Declined", "reason": reason}
-
-    with open(LOG_FILE, "w") as f:
-        json.dump(meeting_logs, f, indent=4)
+    config = get_config()
+    store = get_store(config)
+    if response == "accept":
+        store.set_rsvp_all(email, "Accepted", feed=get_change_feed(config))
+    elif response == "decline":
+        store.set_rsvp_all(email, {"status": "Declined", "reason": reason}, feed=get_change_feed(config))
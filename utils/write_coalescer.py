@@ -0,0 +1,83 @@
+"""
+Group commit for small writes that each need their own acknowledgement.
+
+RSVP clicks each change one value but, on the JSON backends, cost a full
+rewrite of the log. `WriteCoalescer.submit()` queues the change and
+blocks: the first caller to find no flush in progress becomes the leader,
+waits `window` seconds for others to join, then applies everything queued
+with one `flush(items)` call (one lock, one read, one write). Every caller
+returns its own result, or raises its batch's exception, only after the
+write that contains its change has completed.
+"""
+
+import threading
+import time
+
+from utils.metrics import counter
+
+COALESCED = counter("coalesced_writes_total", "Writes submitted and batches flushed by write coalescers", ["name", "stage"])
+
+
+class _Slot:
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class WriteCoalescer:
+    def __init__(self, flush, window=0.005, max_batch=500, name="writes"):
+        self._flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = []
+        self._flushing = False
+
+    def submit(self, item):
+        """Queue `item`, wait until it has been flushed and return its result."""
+        slot = _Slot(item)
+        COALESCED.inc(name=self.name, stage="submitted")
+        with self._cond:
+            self._pending.append(slot)
+            while self._flushing and not slot.done:
+                self._cond.wait()
+            if not slot.done:
+                self._flushing = True
+        if not slot.done:
+            self._lead(slot)
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _lead(self, slot):
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            while not slot.done:
+                with self._cond:
+                    batch = self._pending[: self.max_batch]
+                    del self._pending[: self.max_batch]
+                self._run(batch)
+        finally:
+            # Whoever is still queued elects a new leader.
+            with self._cond:
+                self._flushing = False
+                self._cond.notify_all()
+
+    def _run(self, batch):
+        COALESCED.inc(name=self.name, stage="flushed")
+        try:
+            results = self._flush([queued.item for queued in batch])
+        except Exception as e:
+            results, error = [None] * len(batch), e
+        else:
+            error = None
+        with self._cond:
+            for queued, result in zip(batch, results):
+                queued.result, queued.error, queued.done = result, error, True
+            self._cond.notify_all()